@@ -27,6 +27,7 @@ classes = [
 
 object_properties = [
     ("wrote", "Author", "Paper", "Indicates authorship", "Links an author to papers they have written"),
+    ("co_authored_with", "Author", "Author", "Indicates co-authorship", "Links an author to the authors they have written papers with"),
     ("corresponded_by", "Paper", "Author", "Indicates correspondence", "Links a paper to its corresponding author"),
     ("cited_in", "Paper", "Paper", "Indicates citation", "Links a paper to papers it cites"),
     ("related_to", "Paper", "Keyword", "Indicates topic relation", "Links a paper to its keywords"),
@@ -36,6 +37,7 @@ object_properties = [
     ("affiliated_with", "Author", "Affiliation", "Indicates institutional affiliation", "Links an author to their institution"),
     ("reviewed", "Author", "Review", "Indicates review authorship", "Links an author to reviews they have written"),
     ("reviews", "Review", "Paper", "Indicates paper review", "Links a review to the paper it reviews"),
+    ("has_expertise", "Author", "Keyword", "Indicates reviewer expertise", "Links a reviewer to the keywords of the papers they have reviewed"),
     ("has_journal_editor", "Volume", "JournalEditor", "Has journal editor", "Links a volume to its journal editor"),
     ("has_conference_chair", "Edition", "ConferenceChair", "Has conference chair", "Links an event to its conference chair"),
     ("edits_journal", "JournalEditor", "Journal", "Edits journal", "Links a journal editor to the journals they edit"),
@@ -50,8 +52,11 @@ data_properties = [
     ("url", "Paper", XSD.string, "Paper URL", "Web address of the paper"),
     ("start_page", "Paper", XSD.integer, "Starting page", "First page number of the paper"),
     ("end_page", "Paper", XSD.integer, "Ending page", "Last page number of the paper"),
+    ("citation_count", "Paper", XSD.integer, "Citation count", "Number of papers citing the paper"),
+    ("pagerank", "Paper", XSD.double, "Citation PageRank", "PageRank score of the paper in the citation graph"),
     ("author_id", "Author", XSD.string, "Author identifier", "Unique identifier for an author"),
     ("name", "Author", XSD.string, "Author name", "Full name of the author"),
+    ("h_index", "Author", XSD.integer, "Author h-index", "h-index of the author computed from the citation graph"),
     ("journal_id", "Journal", XSD.string, "Journal identifier", "Unique identifier for a journal"),
     ("name", "Journal", XSD.string, "Journal name", "Name of the journal"),
     ("issn", "Journal", XSD.string, "ISSN", "International Standard Serial Number"),
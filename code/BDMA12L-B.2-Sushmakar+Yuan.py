@@ -1,16 +1,33 @@
 import pandas as pd
 import uuid
 from rdflib import Graph, Namespace, Literal, URIRef, XSD
-from rdflib.namespace import RDF, RDFS
+from rdflib.namespace import RDF, RDFS, OWL
 import os
+import argparse
 from pathlib import Path
 
+from helper.coauthorship_index import build_coauthor_index, save_coauthor_index
+from helper.citation_analytics import compute_citation_metrics, save_citation_metrics
+from helper.reviewer_expertise import build_reviewer_expertise, save_reviewer_expertise, load_review_edges
+from helper.memory_budget import StageMemoryTracker, TextSideStore, BudgetedGraph
+from helper.csv_prefetch import CsvPrefetcher
+from helper.triple_mappings import review_triples, paper_keyword_triples, expertise_triples
+from helper.query_planner import predicate_statistics
+from helper.csv_cache import read_csv_cached
+from helper.triple_sort import external_sort_dedup, ntriples_line
+from helper.entity_resolution import resolve_persons, save_person_links
+from helper.text_index import build_text_index
+
 
 DATA_DIR = Path("../data")
 GEN_DATA_DIR = Path("../data_generated")  # Added generated data directory
 OUTPUT_DIR = Path("../resources")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Set in main() from --coauthor-triples: also emit co_authored_with triples
+# (the co-authorship index is always saved as a side table)
+coauthor_triples = False
+
 
 g = Graph()
 
@@ -28,12 +45,26 @@ def create_uri(resource_type, identifier):
     return RESOURCE[f"{resource_type}/{str(identifier)}"]
 
 
+# Set in main() when --prefetch is given
+prefetcher = None
+
+
+def csv_path(filename, generated=False):
+    return (GEN_DATA_DIR if generated else DATA_DIR) / filename
+
+
 def load_csv(filename, generated=False):
+    if prefetcher is not None:
+        return prefetcher.get(filename, generated)
+    return read_csv_file(filename, generated)
+
+
+def read_csv_file(filename, generated=False):
     try:
         if generated:
-            return pd.read_csv(GEN_DATA_DIR / filename, dtype=str)
+            return read_csv_cached(GEN_DATA_DIR / filename)
         else:
-            return pd.read_csv(DATA_DIR / filename, dtype=str)
+            return read_csv_cached(DATA_DIR / filename)
     except Exception as e:
         print(f"Warning: Could not load {filename}: {e}")
         return pd.DataFrame()
@@ -175,6 +206,30 @@ def add_conference_chairs():
     
     print(f"Added a total of {count} conference chairs")
 
+# Link JournalEditor and ConferenceChair records to the Author they were drawn from
+def add_person_same_as():
+    print("Adding Person sameAs links...")
+    authors_df = load_csv("author.csv")
+    editors_df = load_csv("journal_editor.csv", generated=True)
+    chairs_df = load_csv("conference_chair.csv", generated=True)
+    
+    if len(editors_df) == 0 and len(chairs_df) == 0:
+        print("Could not find generated editor/chair data, skipping sameAs links")
+        return
+    
+    links_df, ambiguous = resolve_persons(authors_df, editors_df, chairs_df)
+    save_person_links(links_df)
+    
+    count = 0
+    for person_id, person_type, author_id in links_df.itertuples(index=False):
+        g.add((create_uri(person_type, person_id), OWL.sameAs, create_uri("author", author_id)))
+        
+        count += 1
+        if count % 1000 == 0:
+            print(f"Processed {count} sameAs links")
+    
+    print(f"Added a total of {count} sameAs links ({ambiguous} ambiguous records left unlinked)")
+
 # Add Journal instances
 def add_journals():
     print("Adding Journal instances...")
@@ -325,30 +380,8 @@ def add_reviews():
     reviews_df = load_csv("review_relations.csv")
     count = 0
     for _, row in reviews_df.iterrows():
-        
-        review_id = f"rev_{row['authorId']}_{row['paperId']}"
-        review_uri = create_uri("review", review_id)
-        
-        g.add((review_uri, RDF.type, RESEARCH.Review))
-        g.add((review_uri, RESEARCH.review_id, Literal(review_id)))
-        
-        if pd.notna(row['comments']):
-            g.add((review_uri, RESEARCH.comments, Literal(row['comments'])))
-        
-        if pd.notna(row['vote']):
-            try:
-                vote_value = int(row['vote'])
-                g.add((review_uri, RESEARCH.vote, Literal(vote_value)))
-            except:
-                # If vote is not a number, handle as string
-                g.add((review_uri, RESEARCH.vote, Literal(row['vote'])))
-        
-        # Add review relationships
-        author_uri = create_uri("author", row['authorId'])
-        paper_uri = create_uri("paper", row['paperId'])
-        
-        g.add((author_uri, RESEARCH.reviewed, review_uri))  # Author reviewed the review
-        g.add((review_uri, RESEARCH.reviews, paper_uri))    # Review reviews the paper
+        for triple in review_triples(row):
+            g.add(triple)
         
         count += 1
         if count % 1000 == 0:
@@ -460,6 +493,28 @@ def add_author_wrote_paper():
             print(f"Processed {count} author-paper relationships")
     
     print(f"Added a total of {count} author-paper relationships")
+    
+    # Materialize the co-authorship index so query_2 does not need the wrote self-join
+    coauthor_df = build_coauthor_index(relations_df)
+    save_coauthor_index(coauthor_df)
+    if coauthor_triples:
+        add_author_co_authored_with_author(coauthor_df)
+
+
+def add_author_co_authored_with_author(coauthor_df):
+    print("Adding Author-CoAuthor relationships...")
+    count = 0
+    for author_id, co_author_id in zip(coauthor_df['authorId'], coauthor_df['coAuthorId']):
+        author_uri = create_uri("author", author_id)
+        co_author_uri = create_uri("author", co_author_id)
+        
+        g.add((author_uri, RESEARCH.co_authored_with, co_author_uri))
+        
+        count += 1
+        if count % 10000 == 0:
+            print(f"Processed {count} co-author relationships")
+    
+    print(f"Added a total of {count} co-author relationships")
 
 
 def add_paper_corresponded_by_author():
@@ -511,6 +566,30 @@ def add_paper_cited_in_paper():
             print(f"Processed {count} paper citation relationships")
     
     print(f"Added a total of {count} paper citation relationships")
+    
+    add_citation_metrics(relations_df)
+
+
+def add_citation_metrics(citations_df):
+    print("Adding citation metrics...")
+    wrote_df = load_csv("author_wrote_paper.csv")
+    if len(citations_df) == 0 or len(wrote_df) == 0:
+        print("Missing citation or authorship data, skipping citation metrics")
+        return
+    
+    paper_metrics_df, author_metrics_df = compute_citation_metrics(citations_df, wrote_df)
+    save_citation_metrics(paper_metrics_df, author_metrics_df)
+    
+    for row in paper_metrics_df.itertuples(index=False):
+        paper_uri = create_uri("paper", row.paperId)
+        g.add((paper_uri, RESEARCH.citation_count, Literal(int(row.citations))))
+        g.add((paper_uri, RESEARCH.pagerank, Literal(float(row.pagerank), datatype=XSD.double)))
+    
+    for row in author_metrics_df.itertuples(index=False):
+        author_uri = create_uri("author", row.authorId)
+        g.add((author_uri, RESEARCH.h_index, Literal(int(row.h_index))))
+    
+    print(f"Added citation metrics for {len(paper_metrics_df)} papers and {len(author_metrics_df)} authors")
 
 
 def add_paper_related_to_keyword():
@@ -518,10 +597,8 @@ def add_paper_related_to_keyword():
     relations_df = load_csv("paper_isRelatedTo_keyword.csv")
     count = 0
     for _, row in relations_df.iterrows():
-        paper_uri = create_uri("paper", row['paperId'])
-        keyword_uri = create_uri("keyword", row['keywordId'])
-        
-        g.add((paper_uri, RESEARCH.related_to, keyword_uri))
+        for triple in paper_keyword_triples(row):
+            g.add(triple)
         
         count += 1
         if count % 1000 == 0:
@@ -530,6 +607,39 @@ def add_paper_related_to_keyword():
     print(f"Added a total of {count} paper-keyword relationships")
 
 
+def add_reviewer_has_expertise():
+    print("Adding Reviewer-Expertise relationships...")
+    paper_keyword_df = load_csv("paper_isRelatedTo_keyword.csv")
+    review_edges_df = load_review_edges()
+    expertise_df = build_reviewer_expertise(review_edges_df, paper_keyword_df)
+    # Later review deliveries are folded in with `python -m helper.reviewer_expertise --update`
+    save_reviewer_expertise(expertise_df, review_edges_df)
+    count = 0
+    for row in expertise_df[['authorId', 'keywordId']].to_dict('records'):
+        for triple in expertise_triples(row):
+            g.add(triple)
+        
+        count += 1
+        if count % 1000 == 0:
+            print(f"Processed {count} reviewer-expertise relationships")
+    
+    print(f"Added a total of {count} reviewer-expertise relationships")
+
+
+# Inverted index over titles, abstracts and keywords (no triples are added)
+def build_paper_text_index():
+    print("Building paper text index...")
+    papers_df = load_csv("paper.csv")
+    paper_keyword_df = load_csv("paper_isRelatedTo_keyword.csv")
+    keywords_df = load_csv("keyword.csv")
+    
+    if len(papers_df) == 0:
+        print("Could not find paper.csv, skipping the text index")
+        return
+    
+    build_text_index(papers_df, paper_keyword_df, keywords_df)
+
+
 def add_paper_published_in_edition():
     print("Adding Paper-Edition relationships...")
     relations_df = load_csv("paper_publishedIn_edition.csv")
@@ -598,44 +708,142 @@ def add_journal_has_volume():
     print(f"Added a total of {count} journal-volume relationships")
 
 
+ENTITY_STAGES = [
+    add_papers,
+    add_authors,
+    add_journal_editors,
+    add_conference_chairs,
+    add_person_same_as,
+    add_journals,
+    add_events,
+    add_editions,
+    add_volumes,
+    add_keywords,
+    add_affiliations,
+    add_reviews,
+]
+
+RELATIONSHIP_STAGES = [
+    add_author_wrote_paper,
+    add_paper_corresponded_by_author,
+    add_author_affiliated_with_affiliation,
+    add_paper_cited_in_paper,
+    add_paper_related_to_keyword,
+    add_reviewer_has_expertise,
+    build_paper_text_index,
+    add_paper_published_in_edition,
+    add_paper_published_in_volume,
+    add_event_has_edition,
+    add_journal_has_volume,
+    add_volume_has_journal_editor,
+    add_edition_has_conference_chair,
+    add_editor_edits_journal,
+    add_chair_chairs_event,
+]
+
+
+# CSV files each stage loads, in order, so they can be prefetched ahead of the stage
+STAGE_INPUTS = {
+    "add_papers": [("paper.csv", False), ("paper_publishedIn_volume.csv", False), ("paper_publishedIn_edition.csv", False)],
+    "add_authors": [("author.csv", False)],
+    "add_journal_editors": [("journal_editor.csv", True)],
+    "add_conference_chairs": [("conference_chair.csv", True)],
+    "add_person_same_as": [("author.csv", False), ("journal_editor.csv", True), ("conference_chair.csv", True)],
+    "add_journals": [("journal.csv", False)],
+    "add_events": [("event.csv", False)],
+    "add_editions": [("edition.csv", False)],
+    "add_volumes": [("volume.csv", False)],
+    "add_keywords": [("keyword.csv", False)],
+    "add_affiliations": [("affiliation.csv", False)],
+    "add_reviews": [("review_relations.csv", False)],
+    "add_author_wrote_paper": [("author_wrote_paper.csv", False)],
+    "add_paper_corresponded_by_author": [("paper_correspondedBy_author.csv", False)],
+    "add_author_affiliated_with_affiliation": [("author_affiliatedWith_affiliation.csv", False)],
+    "add_paper_cited_in_paper": [("paper_citedIn_paper.csv", False), ("author_wrote_paper.csv", False)],
+    "add_paper_related_to_keyword": [("paper_isRelatedTo_keyword.csv", False)],
+    "add_reviewer_has_expertise": [("paper_isRelatedTo_keyword.csv", False)],
+    "build_paper_text_index": [("paper.csv", False), ("paper_isRelatedTo_keyword.csv", False), ("keyword.csv", False)],
+    "add_paper_published_in_edition": [("paper_publishedIn_edition.csv", False)],
+    "add_paper_published_in_volume": [("paper_publishedIn_volume.csv", False)],
+    "add_event_has_edition": [("event_hasEdition_edition.csv", False)],
+    "add_journal_has_volume": [("journal_hasVolume_volume.csv", False)],
+    "add_volume_has_journal_editor": [("volume_hasJournalEditor_editor.csv", True)],
+    "add_edition_has_conference_chair": [("edition_hasConferenceChair_chair.csv", True)],
+    "add_editor_edits_journal": [("journalEditor_editsJournal_journal.csv", True)],
+    "add_chair_chairs_event": [("conferenceChair_chairsEvent_event.csv", True)],
+}
+
+
+def graph_ntriples(graph, side_store=None):
+    for triple in graph:
+        yield ntriples_line(triple)
+    if side_store is not None:
+        yield from side_store.ntriples()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Create the research ABOX")
+    parser.add_argument("--memory-budget", type=float, default=None,
+                        help="Memory budget in MB; enables per-stage tracemalloc accounting and fails fast when exceeded")
+    parser.add_argument("--offload-text", action="store_true",
+                        help="Keep abstracts and review comments in a side file instead of the in-memory graph")
+    parser.add_argument("--prefetch", action="store_true",
+                        help="Load the CSVs of upcoming stages on background threads while the current stage runs")
+    parser.add_argument("--prefetch-budget", type=float, default=512,
+                        help="Maximum estimated size in MB of prefetched DataFrames waiting to be consumed")
+    parser.add_argument("--coauthor-triples", action="store_true",
+                        help="Also emit research:co_authored_with triples (needed by query_2_coauthor.sparql)")
+    parser.add_argument("--ntriples", action="store_true",
+                        help="Also write a sorted, duplicate-free abox.nt through the external sort")
+    return parser.parse_args()
+
+
 def main():
+    global g, prefetcher, coauthor_triples
+    args = parse_args()
+    coauthor_triples = args.coauthor_triples
     print("Starting ABOX creation...")
     
-    # Add entities
-    add_papers()
-    add_authors()
-    add_journal_editors()  
-    add_conference_chairs()  
-    add_journals()
-    add_events()
-    add_editions()
-    add_volumes()
-    add_keywords()
-    add_affiliations()
-    add_reviews()
-    
-    # Add relationships
-    add_author_wrote_paper()
-    add_paper_corresponded_by_author()
-    add_author_affiliated_with_affiliation()
-    add_paper_cited_in_paper()
-    add_paper_related_to_keyword()
-    add_paper_published_in_edition()
-    add_paper_published_in_volume()
-    add_event_has_edition()
-    add_journal_has_volume()
-    
-    
-    add_volume_has_journal_editor()  
-    add_edition_has_conference_chair()  
-    add_editor_edits_journal()  
-    add_chair_chairs_event() 
-    
+    tracker = StageMemoryTracker(args.memory_budget)
+    side_store = None
+    if args.offload_text:
+        side_store = TextSideStore(OUTPUT_DIR / "abox_text.dat")
+    if args.memory_budget or side_store is not None:
+        # Share the store (and TBOX triples) of the module-level graph; without a budget
+        # the tracker's checks are no-ops
+        g = BudgetedGraph(g.store, tracker, side_store=side_store, identifier=g.identifier,
+                          offload_predicates=[RESEARCH.abstract, RESEARCH.comments])
+    
+    stages = ENTITY_STAGES + RELATIONSHIP_STAGES
+    if args.prefetch:
+        schedule = [key for stage in stages for key in STAGE_INPUTS.get(stage.__name__, [])]
+        prefetcher = CsvPrefetcher(read_csv_file, csv_path, schedule, max_bytes=int(args.prefetch_budget * 2**20))
+    
+    # Add entities, then relationships
+    for stage in stages:
+        with tracker.stage(stage.__name__):
+            stage()
+    
+    if prefetcher is not None:
+        prefetcher.report()
+        prefetcher.close()
+        prefetcher = None
 
     # Save ABOX in RDFS format
     output_file = OUTPUT_DIR / "abox.ttl"
     print(f"Saving ABOX to {output_file}...")
-    g.serialize(destination=str(output_file), format="turtle")
+    with tracker.stage("serialize"):
+        g.serialize(destination=str(output_file), format="turtle")
+        if side_store is not None:
+            print(f"Appending {len(side_store)} offloaded text triples...")
+            side_store.append_to(output_file)
+    
+    if args.ntriples:
+        with tracker.stage("sorted_ntriples"):
+            external_sort_dedup(graph_ntriples(g, side_store), OUTPUT_DIR / "abox.nt")
+    if side_store is not None:
+        side_store.close()
+    tracker.report()
     
     # Print statistics
     print("\n==== ABOX Statistics ====")
@@ -659,7 +867,7 @@ def main():
         property_counts[prop_name] = count
         print(f"Relationship {prop_name}: {count} triples")
     
-    total_triples = len(g)
+    total_triples = len(g) + (len(side_store) if side_store is not None else 0)
     print(f"\nTotal number of triples: {total_triples}")
     
     # Save statistics to JSON file
@@ -667,7 +875,9 @@ def main():
     stats = {
         "classes": class_counts,
         "properties": property_counts,
-        "total_triples": total_triples
+        "total_triples": total_triples,
+        # Distinct subject/object counts per predicate, used by helper/query_planner.py
+        "predicate_stats": predicate_statistics(g, side_store)
     }
     with open(OUTPUT_DIR / "abox_stats.json", "w") as f:
         json.dump(stats, f, indent=2)
@@ -0,0 +1,132 @@
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from helper.data_io import load_csv, OUTPUT_DIR
+
+PAPER_METRICS_FILE = "paper_citation_metrics.csv"
+AUTHOR_METRICS_FILE = "author_citation_metrics.csv"
+
+
+# Citation graph as a CSR adjacency matrix: row = citing paper, column = cited paper.
+# Indices are int32 and the data float32, so 20M edges (50x today) stay around 160 MB.
+def build_citation_matrix(citations_df, paper_ids=None):
+    citations_df = citations_df[['paperId', 'citingPaperId']].dropna().drop_duplicates()
+    if paper_ids is None:
+        paper_ids = pd.Index(pd.unique(np.concatenate([
+            citations_df['citingPaperId'].to_numpy(), citations_df['paperId'].to_numpy()])))
+    else:
+        paper_ids = pd.Index(paper_ids)
+
+    citing = paper_ids.get_indexer(citations_df['citingPaperId'])
+    cited = paper_ids.get_indexer(citations_df['paperId'])
+    known = (citing >= 0) & (cited >= 0)
+
+    matrix = sparse.csr_matrix(
+        (np.ones(known.sum(), dtype=np.float32), (citing[known].astype(np.int32), cited[known].astype(np.int32))),
+        shape=(len(paper_ids), len(paper_ids)),
+    )
+    return matrix, paper_ids
+
+
+# Power iteration on the transposed adjacency; dangling papers (no outgoing citations)
+# spread their rank uniformly
+def pagerank(matrix, damping=0.85, tol=1e-6, max_iter=100):
+    n = matrix.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    out_degree = np.asarray(matrix.sum(axis=1)).ravel()
+    dangling = out_degree == 0
+    inv_out = np.zeros(n, dtype=np.float64)
+    inv_out[~dangling] = 1.0 / out_degree[~dangling]
+    transposed = matrix.T.tocsr()
+
+    rank = np.full(n, 1.0 / n)
+    for iteration in range(max_iter):
+        new_rank = damping * (transposed @ (rank * inv_out))
+        new_rank += (damping * rank[dangling].sum() + 1.0 - damping) / n
+        delta = np.abs(new_rank - rank).sum()
+        rank = new_rank
+        if delta < tol:
+            print(f"PageRank converged after {iteration + 1} iterations")
+            break
+    return rank
+
+
+def paper_citation_metrics(matrix, paper_ids):
+    return pd.DataFrame({
+        'paperId': paper_ids,
+        'citations': np.asarray(matrix.sum(axis=0)).ravel().astype(np.int64),
+        'references': np.asarray(matrix.sum(axis=1)).ravel().astype(np.int64),
+        'pagerank': pagerank(matrix),
+    })
+
+
+# h-index per author through wrote: rank each author's papers by citations (descending)
+# and take the largest rank whose paper still has at least that many citations
+def author_h_index(wrote_df, paper_metrics_df):
+    papers = wrote_df[['authorId', 'paperId']].dropna().drop_duplicates().merge(
+        paper_metrics_df[['paperId', 'citations']], on='paperId', how='left')
+    papers['citations'] = papers['citations'].fillna(0).astype(np.int64)
+
+    papers = papers.sort_values(['authorId', 'citations'], ascending=[True, False])
+    papers['rank'] = papers.groupby('authorId').cumcount() + 1
+    papers['h'] = np.where(papers['citations'] >= papers['rank'], papers['rank'], 0)
+
+    return papers.groupby('authorId').agg(
+        papers=('paperId', 'size'),
+        citations=('citations', 'sum'),
+        h_index=('h', 'max'),
+    ).reset_index()
+
+
+def compute_citation_metrics(citations_df, wrote_df):
+    matrix, paper_ids = build_citation_matrix(citations_df)
+    paper_metrics_df = paper_citation_metrics(matrix, paper_ids)
+    author_metrics_df = author_h_index(wrote_df, paper_metrics_df)
+    return paper_metrics_df, author_metrics_df
+
+
+def save_citation_metrics(paper_metrics_df, author_metrics_df):
+    paper_metrics_df.to_csv(OUTPUT_DIR / PAPER_METRICS_FILE, index=False)
+    author_metrics_df.to_csv(OUTPUT_DIR / AUTHOR_METRICS_FILE, index=False)
+    print(f"Saved citation metrics for {len(paper_metrics_df)} papers and {len(author_metrics_df)} authors")
+
+
+# Time the analytics on the shipped citation graph and on a graph scaled up by
+# replicating it `scale` times with disjoint paper ids
+def benchmark(scale=50):
+    import tracemalloc
+
+    citations_df = load_csv("paper_citedIn_paper.csv")
+    wrote_df = load_csv("author_wrote_paper.csv")
+
+    for factor in (1, scale):
+        if factor == 1:
+            scaled_df = citations_df
+        else:
+            scaled_df = pd.concat([
+                citations_df.assign(paperId=citations_df['paperId'] + f"_{i}",
+                                    citingPaperId=citations_df['citingPaperId'] + f"_{i}")
+                for i in range(factor)
+            ], ignore_index=True)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        matrix, paper_ids = build_citation_matrix(scaled_df)
+        paper_metrics_df = paper_citation_metrics(matrix, paper_ids)
+        if factor == 1:
+            author_h_index(wrote_df, paper_metrics_df)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"x{factor}: {matrix.nnz} edges, {len(paper_ids)} papers, "
+              f"{elapsed:.2f}s, peak {peak / 2**20:.0f} MiB (excluding the input frame)")
+        del scaled_df, matrix, paper_metrics_df
+
+
+if __name__ == "__main__":
+    benchmark()
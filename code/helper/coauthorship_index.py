@@ -0,0 +1,115 @@
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from helper.data_io import load_csv, load_query, resource_uri, OUTPUT_DIR
+
+COAUTHOR_INDEX_FILE = "coauthor_index.csv"
+
+
+# Build the co-authorship index (authorId, coAuthorId, papers) from the wrote relation.
+# The self-join is done as a sparse author x paper incidence product, so every
+# co-author pair is produced once with its shared paper count instead of once per paper.
+def build_coauthor_index(wrote_df):
+    if len(wrote_df) == 0:
+        return pd.DataFrame(columns=['authorId', 'coAuthorId', 'papers'])
+
+    wrote_df = wrote_df[['authorId', 'paperId']].dropna().drop_duplicates()
+    author_codes, authors = pd.factorize(wrote_df['authorId'])
+    paper_codes, papers = pd.factorize(wrote_df['paperId'])
+
+    incidence = sparse.csr_matrix(
+        (np.ones(len(wrote_df), dtype=np.int32), (author_codes, paper_codes)),
+        shape=(len(authors), len(papers)),
+    )
+    shared = (incidence @ incidence.T).tocoo()
+
+    # Drop the diagonal (an author is not their own co-author)
+    off_diagonal = shared.row != shared.col
+    return pd.DataFrame({
+        'authorId': authors[shared.row[off_diagonal]],
+        'coAuthorId': authors[shared.col[off_diagonal]],
+        'papers': shared.data[off_diagonal],
+    })
+
+
+def save_coauthor_index(index_df):
+    output_file = OUTPUT_DIR / COAUTHOR_INDEX_FILE
+    index_df.to_csv(output_file, index=False)
+    print(f"Saved co-authorship index to {output_file}, {len(index_df)} pairs")
+
+
+def load_coauthor_index():
+    try:
+        return pd.read_csv(OUTPUT_DIR / COAUTHOR_INDEX_FILE, dtype={'authorId': str, 'coAuthorId': str})
+    except Exception as e:
+        print(f"Warning: Could not load {COAUTHOR_INDEX_FILE}: {e}")
+        return pd.DataFrame(columns=['authorId', 'coAuthorId', 'papers'])
+
+
+# Equivalent of query_2.sparql evaluated from the index: per affiliation, the number of
+# distinct authors with a co-author in the same affiliation and the list of those co-authors
+def affiliation_collaborators(index_df, affiliated_df, affiliation_df):
+    affiliated_df = affiliated_df[['authorId', 'affId']].drop_duplicates()
+
+    pairs = index_df.merge(affiliated_df, on='authorId')
+    pairs = pairs.merge(affiliated_df.rename(columns={'authorId': 'coAuthorId'}), on=['coAuthorId', 'affId'])
+    pairs = pairs.merge(affiliation_df[['affId', 'name']].dropna(), on='affId')
+    pairs['coAuthor'] = resource_uri("author", "") + pairs['coAuthorId']
+
+    result = pairs.groupby(['affId', 'name'], sort=False).agg(
+        researchers=('authorId', 'nunique'),
+        collaborators=('coAuthor', lambda s: "; ".join(s.drop_duplicates())),
+    )
+    return result.reset_index().rename(columns={'name': 'affiliationName'})[
+        ['affiliationName', 'researchers', 'collaborators']]
+
+
+# Benchmark query_2 against the raw wrote self-join and against the index
+def benchmark(abox_file=OUTPUT_DIR / "abox.ttl"):
+    from rdflib import Graph, Namespace, URIRef
+
+    RESEARCH = Namespace("http://example.org/research#")
+
+    wrote_df = load_csv("author_wrote_paper.csv")
+    affiliated_df = load_csv("author_affiliatedWith_affiliation.csv")
+    affiliation_df = load_csv("affiliation.csv")
+
+    start = time.perf_counter()
+    index_df = build_coauthor_index(wrote_df)
+    index_time = time.perf_counter() - start
+    print(f"Built co-authorship index: {len(index_df)} pairs in {index_time:.3f}s")
+
+    print(f"Loading {abox_file}...")
+    g = Graph()
+    g.parse(str(abox_file), format="turtle")
+
+    start = time.perf_counter()
+    raw_rows = list(g.query(load_query("query_2.sparql")))
+    raw_time = time.perf_counter() - start
+
+    for author_id, co_author_id in zip(index_df['authorId'], index_df['coAuthorId']):
+        g.add((URIRef(resource_uri("author", author_id)), RESEARCH.co_authored_with,
+               URIRef(resource_uri("author", co_author_id))))
+
+    start = time.perf_counter()
+    indexed_rows = list(g.query(load_query("query_2_coauthor.sparql")))
+    indexed_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table_df = affiliation_collaborators(index_df, affiliated_df, affiliation_df)
+    table_time = time.perf_counter() - start
+
+    print("\n==== query_2 benchmark ====")
+    print(f"Raw wrote self-join (SPARQL):        {raw_time:.3f}s, {len(raw_rows)} rows")
+    print(f"co_authored_with triples (SPARQL):   {indexed_time:.3f}s, {len(indexed_rows)} rows")
+    print(f"Index side table (pandas):           {table_time:.3f}s, {len(table_df)} rows")
+
+    raw_counts = {str(row[0]): int(row[1]) for row in raw_rows}
+    table_counts = dict(zip(table_df['affiliationName'], table_df['researchers']))
+    print(f"Researcher counts match raw query: {raw_counts == table_counts}")
+
+
+if __name__ == "__main__":
+    benchmark()
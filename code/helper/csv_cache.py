@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+# Columnar copies of the source CSVs, stored as uncompressed Arrow IPC (Feather v2) files
+# so later runs can memory-map them instead of reparsing the CSV
+CACHE_DIR = Path("../.cache/staging")
+MANIFEST_FILE = CACHE_DIR / "manifest.json"
+
+# The prefetcher loads several files at once; manifest updates must not interleave
+_manifest_lock = threading.Lock()
+
+
+def _file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_manifest():
+    try:
+        with open(MANIFEST_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(manifest):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Per-writer temporary name: several processes (B.2 and the helper CLIs) may share the cache
+    tmp_file = MANIFEST_FILE.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, MANIFEST_FILE)
+
+
+def _update_manifest(key, entry):
+    with _manifest_lock:
+        manifest = _load_manifest()
+        if entry is None:
+            manifest.pop(key, None)
+        else:
+            manifest[key] = entry
+        _save_manifest(manifest)
+
+
+def _cache_file(path, digest):
+    return CACHE_DIR / f"{Path(path).stem}-{digest[:16]}.arrow"
+
+
+# Same result as pd.read_csv(path, dtype=str), served from the columnar cache when the
+# source is unchanged. mtime and size are checked first; the content hash is only
+# recomputed when they differ, so a touched-but-identical file keeps its cache entry.
+def read_csv_cached(path):
+    path = Path(path)
+    if pa is None:
+        return pd.read_csv(path, dtype=str)
+
+    stat = path.stat()
+    manifest = _load_manifest()
+    key = str(path.resolve())
+    entry = manifest.get(key)
+
+    if entry is None or entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size:
+        digest = _file_hash(path)
+        if entry is None or entry["sha1"] != digest:
+            entry = None
+        else:
+            entry.update(mtime=stat.st_mtime, size=stat.st_size)
+            _update_manifest(key, entry)
+    else:
+        digest = entry["sha1"]
+
+    cache_file = _cache_file(path, digest)
+    if entry is not None and cache_file.exists():
+        table = feather.read_table(cache_file, memory_map=True)
+        df = table.to_pandas()
+        # Older pandas return Arrow nulls as None in object columns; keep NaN like read_csv
+        # does, touching only the columns that have nulls so the others are not copied
+        for name in table.column_names:
+            if table.column(name).null_count and df[name].dtype == object:
+                df[name] = df[name].where(df[name].notna(), np.nan)
+        return df
+
+    df = pd.read_csv(path, dtype=str)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Written under a per-writer name and renamed into place, so other processes never
+    # memory-map a partially written file
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+    feather.write_feather(df, tmp_file, compression="uncompressed")
+    os.replace(tmp_file, cache_file)
+    if entry is not None and "file" in entry and entry["file"] != cache_file.name:
+        (CACHE_DIR / entry["file"]).unlink(missing_ok=True)
+    _update_manifest(key, {"mtime": stat.st_mtime, "size": stat.st_size, "sha1": digest, "file": cache_file.name})
+    return df
+
+
+def clear_cache(path):
+    key = str(Path(path).resolve())
+    entry = _load_manifest().get(key)
+    if entry is not None:
+        (CACHE_DIR / entry["file"]).unlink(missing_ok=True)
+        _update_manifest(key, None)
+
+
+# Cold (parse CSV and write the cache) vs warm (memory-mapped Arrow) load time per input file
+def benchmark(directories=(Path("../data"), Path("../data_generated"))):
+    if pa is None:
+        print("pyarrow is not installed; the staging cache is disabled")
+        return
+
+    print(f"{'file':<45} {'rows':>8} {'cold (s)':>10} {'warm (s)':>10} {'speedup':>8}")
+    total_cold = total_warm = 0.0
+    for directory in directories:
+        for csv_file in sorted(directory.glob("*.csv")):
+            clear_cache(csv_file)
+            start = time.perf_counter()
+            df = read_csv_cached(csv_file)
+            cold = time.perf_counter() - start
+
+            start = time.perf_counter()
+            read_csv_cached(csv_file)
+            warm = time.perf_counter() - start
+
+            total_cold += cold
+            total_warm += warm
+            print(f"{csv_file.name:<45} {len(df):>8} {cold:>10.3f} {warm:>10.3f} {cold / max(warm, 1e-9):>7.1f}x")
+    print(f"{'total':<45} {'':>8} {total_cold:>10.3f} {total_warm:>10.3f} {total_cold / max(total_warm, 1e-9):>7.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,134 @@
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from helper.triple_mappings import review_triples, review_uri, paper_keyword_triples
+
+# Snapshot kinds: key columns used for hash partitioning, the row -> triples mapping and,
+# for rows that mint their own resource, the row -> resource mapping. A removed resource is
+# deleted with all its triples, since the snapshot may not carry every column the builder
+# wrote for it (author_reviewed_paper.csv has no comments or vote).
+SNAPSHOT_KINDS = {
+    "reviews": (['authorId', 'paperId'], review_triples, review_uri),
+    "keywords": (['paperId', 'keywordId'], paper_keyword_triples, None),
+}
+
+
+# Split a CSV snapshot into partition files by hash of the row key, reading it in chunks
+# so neither snapshot has to fit in memory at once
+def partition_snapshot(csv_file, key_columns, partitions, out_dir, chunksize=200000):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for chunk in pd.read_csv(csv_file, dtype=str, chunksize=chunksize):
+        buckets = pd.util.hash_pandas_object(chunk[key_columns], index=False) % partitions
+        for bucket, part in chunk.groupby(buckets.to_numpy()):
+            part_file = out_dir / f"part_{bucket:04d}.csv"
+            part.to_csv(part_file, mode="a", header=not part_file.exists(), index=False)
+
+
+def _read_partition(part_file, columns):
+    if not part_file.exists():
+        return pd.DataFrame(columns=columns)
+    return pd.read_csv(part_file, dtype=str, keep_default_na=False, na_values=[""])
+
+
+# Rows only in the old snapshot are removed, rows only in the new one are added.
+# A row whose non-key columns changed shows up as both (delete, then insert).
+def diff_snapshots(old_file, new_file, key_columns, partitions=16):
+    work_dir = Path(tempfile.mkdtemp(prefix="csv_delta_"))
+    try:
+        partition_snapshot(old_file, key_columns, partitions, work_dir / "old")
+        partition_snapshot(new_file, key_columns, partitions, work_dir / "new")
+        columns = list(pd.read_csv(new_file, dtype=str, nrows=0).columns)
+
+        for bucket in range(partitions):
+            old_df = _read_partition(work_dir / "old" / f"part_{bucket:04d}.csv", columns).drop_duplicates()
+            new_df = _read_partition(work_dir / "new" / f"part_{bucket:04d}.csv", columns).drop_duplicates()
+            merged = old_df.merge(new_df, how="outer", on=columns, indicator=True)
+            removed = merged[merged['_merge'] == 'left_only'].drop(columns='_merge')
+            added = merged[merged['_merge'] == 'right_only'].drop(columns='_merge')
+            yield removed, added
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _format_triple(triple):
+    return " ".join(term.n3() for term in triple) + " ."
+
+
+def _update_batches(operation, triples, batch_size):
+    for start in range(0, len(triples), batch_size):
+        body = "\n".join(_format_triple(t) for t in triples[start:start + batch_size])
+        yield f"{operation} {{\n{body}\n}}"
+
+
+# Delete every triple with one of the resources as subject or object
+def _resource_delete_batches(resources, batch_size):
+    for start in range(0, len(resources), batch_size):
+        values = "\n".join(r.n3() for r in resources[start:start + batch_size])
+        yield f"DELETE {{ ?resource ?p ?o }} WHERE {{\nVALUES ?resource {{\n{values}\n}}\n?resource ?p ?o\n}}"
+        yield f"DELETE {{ ?s ?p ?resource }} WHERE {{\nVALUES ?resource {{\n{values}\n}}\n?s ?p ?resource\n}}"
+
+
+# Map the changed rows through the builder's row -> triples mapping and write
+# DELETE DATA / INSERT DATA operations of at most batch_size triples each
+def write_sparql_delta(old_file, new_file, kind, output_file, batch_size=1000, partitions=16):
+    key_columns, row_triples, row_resource = SNAPSHOT_KINDS[kind]
+    start = time.perf_counter()
+
+    deleted, inserted, removed_resources = [], [], []
+    for removed, added in diff_snapshots(old_file, new_file, key_columns, partitions):
+        # Rows with the same key on both sides were changed, not removed (partitions are by key)
+        kept_keys = set(added[key_columns].itertuples(index=False, name=None))
+        for row in removed.to_dict('records'):
+            if row_resource is not None and tuple(row[c] for c in key_columns) not in kept_keys:
+                removed_resources.append(row_resource(row))
+                continue
+            deleted.extend(row_triples(row))
+        for row in added.to_dict('records'):
+            inserted.extend(row_triples(row))
+
+    # Triples produced by both a removed and an added row (e.g. the Review type when only
+    # the comments changed) are left untouched
+    unchanged = set(deleted) & set(inserted)
+    deleted = list(dict.fromkeys(t for t in deleted if t not in unchanged))
+    inserted = list(dict.fromkeys(t for t in inserted if t not in unchanged))
+
+    write_update_operations(deleted, inserted, output_file, batch_size, list(dict.fromkeys(removed_resources)))
+    print(f"Computed the delta in {time.perf_counter() - start:.2f}s")
+
+
+# Resource deletions, then DELETE DATA and INSERT DATA operations of at most batch_size
+# triples (or resources) each
+def write_update_operations(deleted, inserted, output_file, batch_size=1000, removed_resources=()):
+    operations = list(_resource_delete_batches(list(removed_resources), batch_size))
+    operations += list(_update_batches("DELETE DATA", deleted, batch_size))
+    operations += list(_update_batches("INSERT DATA", inserted, batch_size))
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(" ;\n".join(operations))
+        f.write("\n")
+
+    print(f"Wrote {len(operations)} update operations to {output_file}: {len(removed_resources)} resources removed, "
+          f"{len(deleted)} triples deleted, {len(inserted)} inserted")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emit SPARQL UPDATE deltas between two CSV snapshots")
+    parser.add_argument("old_csv", type=Path)
+    parser.add_argument("new_csv", type=Path)
+    parser.add_argument("--kind", choices=sorted(SNAPSHOT_KINDS), required=True,
+                        help="reviews (author_reviewed_paper.csv) or keywords (paper_isRelatedTo_keyword.csv)")
+    parser.add_argument("--output", type=Path, default=Path("../resources/delta.ru"))
+    parser.add_argument("--batch-size", type=int, default=1000, help="Triples per INSERT DATA / DELETE DATA operation")
+    parser.add_argument("--partitions", type=int, default=16, help="Hash partitions used for the comparison")
+    args = parser.parse_args()
+
+    write_sparql_delta(args.old_csv, args.new_csv, args.kind, args.output,
+                       batch_size=args.batch_size, partitions=args.partitions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import pandas as pd
+from pathlib import Path
+
+from helper.csv_cache import read_csv_cached
+
+# Shared paths for the helper modules (run from the code/ directory, e.g. `python -m helper.<module>`)
+DATA_DIR = Path("../data")
+GEN_DATA_DIR = Path("../data_generated")
+OUTPUT_DIR = Path("../resources")
+QUERY_DIR = Path("BDMA12L-B.3-Sushmakar+Yuan")
+
+RESEARCH_NS = "http://example.org/research#"
+RESOURCE_NS = "http://example.org/resource/"
+
+
+def load_csv(filename, generated=False):
+    try:
+        if generated:
+            return read_csv_cached(GEN_DATA_DIR / filename)
+        else:
+            return read_csv_cached(DATA_DIR / filename)
+    except Exception as e:
+        print(f"Warning: Could not load {filename}: {e}")
+        return pd.DataFrame()
+
+
+def resource_uri(resource_type, identifier):
+    return f"{RESOURCE_NS}{resource_type}/{identifier}"
+
+
+def load_query(filename):
+    with open(QUERY_DIR / filename) as f:
+        return f.read()
@@ -0,0 +1,125 @@
+import re
+import time
+import unicodedata
+
+import pandas as pd
+
+from helper.data_io import load_csv, OUTPUT_DIR
+
+PERSON_LINKS_FILE = "person_links.csv"
+
+
+def normalize_name(names):
+    def normalize(name):
+        name = unicodedata.normalize("NFKD", str(name))
+        name = "".join(c for c in name if not unicodedata.combining(c)).lower()
+        return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", name)).strip()
+    return names.fillna("").map(normalize)
+
+
+# The email local part generate_missing_data.py derives from an author name
+def email_local_part_from_name(names):
+    return names.fillna("").str.lower().str.replace(" ", ".", regex=False)
+
+
+def email_local_part(emails):
+    return emails.fillna("").str.split("@").str[0]
+
+
+# Blocking keys; a candidate pair is an (author, role record) pair sharing a key
+BLOCKING_KEYS = {
+    "normalized_name": lambda df: df['name_key'],
+    "surname_first_initial": lambda df: df['name_key'].str.split(" ").str[-1] + "|" + df['name_key'].str[:1],
+    "email_local_part": lambda df: df['email_key'],
+}
+
+
+def _prepare(authors_df, editors_df, chairs_df):
+    authors = pd.DataFrame({'authorId': authors_df['authorId'], 'name': authors_df['name']})
+    authors['name_key'] = normalize_name(authors['name'])
+    authors['email_key'] = email_local_part_from_name(authors['name'])
+
+    # Either generated file may be missing (an empty DataFrame); resolve whichever exist
+    roles = pd.concat([
+        pd.DataFrame({'personId': df[id_column], 'personType': person_type, 'name': df['name'], 'email': df['email']})
+        for df, id_column, person_type in ((editors_df, 'editorId', 'editor'), (chairs_df, 'chairId', 'chair'))
+        if len(df) > 0
+    ] or [pd.DataFrame(columns=['personId', 'personType', 'name', 'email'])], ignore_index=True)
+    roles['name_key'] = normalize_name(roles['name'])
+    roles['email_key'] = email_local_part(roles['email'])
+    return authors[authors['name_key'] != ""], roles[roles['name_key'] != ""]
+
+
+# Number of candidate pairs a blocking key produces, from block sizes alone (no join)
+def candidate_pair_count(authors, roles, key):
+    author_blocks = BLOCKING_KEYS[key](authors).value_counts()
+    role_blocks = BLOCKING_KEYS[key](roles).value_counts()
+    return int((author_blocks * role_blocks.reindex(author_blocks.index, fill_value=0)).sum())
+
+
+# Link each editor/chair record to the author it was drawn from. Candidates come from a
+# hash join on the normalized name block, and are kept when the email local part also
+# matches. Records matching several authors (homonyms) are left unlinked, since owl:sameAs
+# between them would merge distinct authors.
+def resolve_persons(authors_df, editors_df, chairs_df):
+    authors, roles = _prepare(authors_df, editors_df, chairs_df)
+
+    candidates = roles.merge(authors[['authorId', 'name_key', 'email_key']], on='name_key', suffixes=('', '_author'))
+    matches = candidates[candidates['email_key'] == candidates['email_key_author']]
+
+    matches_per_record = matches.groupby('personId')['authorId'].transform('nunique')
+    links = matches[matches_per_record == 1][['personId', 'personType', 'authorId']].drop_duplicates()
+    ambiguous = matches.loc[matches_per_record > 1, 'personId'].nunique()
+    return links.reset_index(drop=True), ambiguous
+
+
+def save_person_links(links_df):
+    output_file = OUTPUT_DIR / PERSON_LINKS_FILE
+    links_df.to_csv(output_file, index=False)
+    print(f"Saved person links to {output_file}, {len(links_df)} links")
+
+
+# Timings and pair reduction for each blocking key, plus the end-to-end resolution
+def benchmark(scale=1):
+    authors_df = load_csv("author.csv")
+    editors_df = load_csv("journal_editor.csv", generated=True)
+    chairs_df = load_csv("conference_chair.csv", generated=True)
+    if scale > 1:
+        # Each replica is a distinct set of people: ids, names and email local parts all get
+        # the replica suffix, so replicas do not become homonyms of each other
+        def replicate(df, id_column):
+            replicas = []
+            for i in range(scale):
+                replica = df.assign(**{id_column: df[id_column] + f"_{i}", 'name': df['name'] + f"_{i}"})
+                if 'email' in df:
+                    parts = df['email'].fillna("").str.partition("@")
+                    replica['email'] = parts[0] + f"_{i}@" + parts[2]
+                replicas.append(replica)
+            return pd.concat(replicas, ignore_index=True)
+        authors_df = replicate(authors_df, 'authorId')
+        editors_df = replicate(editors_df, 'editorId')
+        chairs_df = replicate(chairs_df, 'chairId')
+
+    start = time.perf_counter()
+    authors, roles = _prepare(authors_df, editors_df, chairs_df)
+    prepare_time = time.perf_counter() - start
+    all_pairs = len(authors) * len(roles)
+
+    print(f"{len(authors)} authors, {len(roles)} editor/chair records, {all_pairs:,} all-pairs comparisons "
+          f"(key preparation {prepare_time:.2f}s)")
+    print(f"{'blocking key':<24} {'candidate pairs':>16} {'reduction':>12} {'time (s)':>10}")
+    for key in BLOCKING_KEYS:
+        start = time.perf_counter()
+        pairs = candidate_pair_count(authors, roles, key)
+        elapsed = time.perf_counter() - start
+        print(f"{key:<24} {pairs:>16,} {all_pairs / max(pairs, 1):>11.0f}x {elapsed:>10.3f}")
+
+    start = time.perf_counter()
+    links_df, ambiguous = resolve_persons(authors_df, editors_df, chairs_df)
+    elapsed = time.perf_counter() - start
+    print(f"Resolved {len(links_df)} of {len(roles)} records in {elapsed:.2f}s ({ambiguous} ambiguous homonyms left unlinked)")
+    return links_df
+
+
+if __name__ == "__main__":
+    save_person_links(benchmark())
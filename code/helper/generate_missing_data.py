@@ -4,6 +4,12 @@ import os
 import random
 from pathlib import Path
 
+try:
+    from helper.csv_cache import read_csv_cached
+except ImportError:
+    # Run as a script (python helper/generate_missing_data.py)
+    from csv_cache import read_csv_cached
+
 # Set random seed to ensure reproducible results
 random.seed(42)
 np.random.seed(42)
@@ -16,7 +22,7 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 # Load existing data
 def load_csv(filename):
     try:
-        return pd.read_csv(DATA_DIR / filename, dtype=str)
+        return read_csv_cached(DATA_DIR / filename)
     except Exception as e:
         print(f"Unable to load {filename}: {e}")
         return pd.DataFrame()
@@ -0,0 +1,417 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from helper.data_io import load_csv, resource_uri, OUTPUT_DIR
+from helper.reviewer_expertise import load_review_edges
+from helper.sketches import SpaceSaving, hll_by_group, hll_precision
+
+ARRAY_DIR = OUTPUT_DIR / "abox_arrays"
+# Driving rows (review edges, affiliation memberships) joined at a time by the approximate mode
+CHUNK_SIZE = 20000
+
+
+def _csr(keys, values, n_keys):
+    order = np.argsort(keys, kind='stable')
+    offsets = np.zeros(n_keys + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n_keys), out=offsets[1:])
+    return offsets, values[order].astype(np.int32)
+
+
+# Encode the relationships the B.3 queries touch as integer arrays (CSR adjacency per
+# relation) so worker processes can memory-map them instead of each loading the ABox
+def export_abox_arrays(array_dir=ARRAY_DIR):
+    authors_df = load_csv("author.csv")
+    keywords_df = load_csv("keyword.csv")
+    affiliation_df = load_csv("affiliation.csv")
+    wrote_df = load_csv("author_wrote_paper.csv").reindex(columns=['authorId', 'paperId']).dropna().drop_duplicates()
+    review_df = load_review_edges().dropna().drop_duplicates()
+    paper_keyword_df = load_csv("paper_isRelatedTo_keyword.csv")[['paperId', 'keywordId']].dropna().drop_duplicates()
+    affiliated_df = load_csv("author_affiliatedWith_affiliation.csv")[['authorId', 'affId']].dropna().drop_duplicates()
+
+    authors = pd.Index(pd.unique(pd.concat([authors_df['authorId'], wrote_df['authorId'],
+                                            review_df['authorId'], affiliated_df['authorId']])))
+    papers = pd.Index(pd.unique(pd.concat([wrote_df['paperId'], review_df['paperId'], paper_keyword_df['paperId']])))
+    affiliations = pd.Index(pd.unique(pd.concat([affiliation_df['affId'], affiliated_df['affId']])))
+
+    # Keywords are grouped by their text, as the query concatenates ?expertise literals
+    keyword_text = dict(zip(keywords_df['keywordId'], keywords_df['keyword']))
+    paper_keyword_df = paper_keyword_df[paper_keyword_df['keywordId'].map(keyword_text).notna()]
+    keyword_codes, keyword_texts = pd.factorize(paper_keyword_df['keywordId'].map(keyword_text), sort=True)
+
+    array_dir.mkdir(parents=True, exist_ok=True)
+    arrays = {}
+    arrays['review_author'] = authors.get_indexer(review_df['authorId']).astype(np.int32)
+    arrays['review_paper'] = papers.get_indexer(review_df['paperId']).astype(np.int32)
+    arrays['paper_keyword_offsets'], arrays['paper_keyword'] = _csr(
+        papers.get_indexer(paper_keyword_df['paperId']), keyword_codes, len(papers))
+    wrote_author = authors.get_indexer(wrote_df['authorId'])
+    wrote_paper = papers.get_indexer(wrote_df['paperId'])
+    arrays['author_paper_offsets'], arrays['author_paper'] = _csr(wrote_author, wrote_paper, len(authors))
+    arrays['paper_author_offsets'], arrays['paper_author'] = _csr(wrote_paper, wrote_author, len(papers))
+    affiliated_author = authors.get_indexer(affiliated_df['authorId']).astype(np.int64)
+    affiliated_aff = affiliations.get_indexer(affiliated_df['affId']).astype(np.int64)
+    arrays['affiliated_author'] = affiliated_author.astype(np.int32)
+    arrays['affiliated_aff'] = affiliated_aff.astype(np.int32)
+    arrays['affiliated_key'] = np.sort(affiliated_author * len(affiliations) + affiliated_aff)
+    for name, array in arrays.items():
+        np.save(array_dir / f"{name}.npy", array)
+
+    author_names = dict(zip(authors_df['authorId'], authors_df['name']))
+    affiliation_names = dict(zip(affiliation_df['affId'], affiliation_df['name']))
+    with open(array_dir / "labels.json", "w") as f:
+        json.dump({
+            "authors": list(authors),
+            "author_names": [author_names.get(a) if isinstance(author_names.get(a), str) else None for a in authors],
+            "keywords": list(keyword_texts),
+            "affiliation_names": [affiliation_names.get(a) if isinstance(affiliation_names.get(a), str) else None
+                                  for a in affiliations],
+            "n_affiliations": len(affiliations),
+        }, f)
+    print(f"Exported ABOX arrays to {array_dir}")
+
+
+class AboxArrays:
+    def __init__(self, array_dir=ARRAY_DIR):
+        for path in array_dir.glob("*.npy"):
+            setattr(self, path.stem, np.load(path, mmap_mode="r"))
+        with open(array_dir / "labels.json") as f:
+            self.labels = json.load(f)
+
+
+# Gather the CSR neighbours of every key in keys: returns (position in keys, neighbour)
+def _expand(offsets, values, keys):
+    starts = offsets[keys]
+    counts = offsets[keys + 1] - starts
+    owner = np.repeat(np.arange(len(keys)), counts)
+    within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, np.asarray(values)[np.repeat(starts, counts) + within]
+
+
+# Multiplicative hash so consecutive codes spread over partitions
+def partition_mask(codes, partition, partitions):
+    return (np.asarray(codes, dtype=np.uint64) * np.uint64(2654435761) % np.uint64(2**32)) % np.uint64(partitions) == partition
+
+
+# Driving entities of a partition for query_1: the (reviewer, paper) review edges
+def _query_1_drivers(arrays, partition, partitions):
+    mask = partition_mask(arrays.review_author, partition, partitions)
+    return (np.asarray(arrays.review_author)[mask].astype(np.int64),
+            np.asarray(arrays.review_paper)[mask].astype(np.int64))
+
+
+# query_1 join: one (reviewer, keyword) row per reviewed paper and keyword
+def _query_1_join(arrays, authors, papers):
+    owner, keywords = _expand(arrays.paper_keyword_offsets, arrays.paper_keyword, papers)
+    return authors[owner], keywords.astype(np.int64)
+
+
+# query_1 join for the reviewers in one partition
+def query_1_stream(arrays, partition=0, partitions=1):
+    return _query_1_join(arrays, *_query_1_drivers(arrays, partition, partitions))
+
+
+# query_1 for the reviewers in one partition: distinct (reviewer, keyword) pairs
+def query_1_pairs(arrays, partition=0, partitions=1):
+    reviewers, keywords = query_1_stream(arrays, partition, partitions)
+    n_keywords = len(arrays.labels["keywords"])
+    keys = np.unique(reviewers * n_keywords + keywords)
+    return keys // n_keywords, keys % n_keywords
+
+
+# Driving entities of a partition for query_2: the (author, affiliation) memberships
+def _query_2_drivers(arrays, partition, partitions):
+    mask = partition_mask(arrays.affiliated_aff, partition, partitions)
+    return (np.asarray(arrays.affiliated_author)[mask].astype(np.int64),
+            np.asarray(arrays.affiliated_aff)[mask].astype(np.int64))
+
+
+# query_2 join: (affiliation, author, co-author) rows for co-authors in the same affiliation
+def _query_2_join(arrays, authors, affs):
+    owner, papers = _expand(arrays.author_paper_offsets, arrays.author_paper, authors)
+    paper_owner, co_authors = _expand(arrays.paper_author_offsets, arrays.paper_author, papers.astype(np.int64))
+    author = authors[owner][paper_owner]
+    aff = affs[owner][paper_owner]
+
+    n_affiliations = arrays.labels["n_affiliations"]
+    co_key = co_authors.astype(np.int64) * n_affiliations + aff
+    pos = np.searchsorted(arrays.affiliated_key, co_key)
+    pos[pos >= len(arrays.affiliated_key)] = 0
+    keep = (np.asarray(arrays.affiliated_key)[pos] == co_key) & (co_authors != author)
+    return aff[keep], author[keep], co_authors[keep].astype(np.int64)
+
+
+# query_2 for the affiliations in one partition
+def query_2_rows(arrays, partition=0, partitions=1):
+    return _query_2_join(arrays, *_query_2_drivers(arrays, partition, partitions))
+
+
+def format_query_1(arrays, reviewers, keywords):
+    labels = arrays.labels
+    df = pd.DataFrame({'reviewer': reviewers, 'keyword': keywords}).sort_values(['reviewer', 'keyword'])
+    df['reviewerName'] = [labels["author_names"][r] for r in df['reviewer']]
+    df = df[df['reviewerName'].notna()]
+    df['expertise'] = [labels["keywords"][k] for k in df['keyword']]
+    result = df.groupby(['reviewer', 'reviewerName'], sort=True)['expertise'].agg(", ".join)
+    return result.reset_index().rename(columns={'expertise': 'expertiseAreas'})[['reviewerName', 'expertiseAreas']]
+
+
+def format_query_2(arrays, affs, authors, co_authors):
+    labels = arrays.labels
+    df = pd.DataFrame({'aff': affs, 'author': authors, 'coAuthor': co_authors})
+    df['affiliationName'] = [labels["affiliation_names"][a] for a in df['aff']]
+    df = df[df['affiliationName'].notna()]
+    grouped = df.groupby(['aff', 'affiliationName'], sort=True)
+    result = grouped.agg(researchers=('author', 'nunique')).reset_index()
+    result['collaborators'] = grouped['coAuthor'].agg(
+        lambda s: "; ".join(resource_uri("author", labels["authors"][c]) for c in np.unique(s))).to_numpy()
+    return result[['affiliationName', 'researchers', 'collaborators']]
+
+
+def _chunks(n, chunk_size):
+    for start in range(0, n, chunk_size):
+        yield slice(start, start + chunk_size)
+
+
+# Fold one chunk of (group, item) join rows into per-group space-saving sketches. The chunk
+# is counted exactly with numpy, then each group's k most frequent items are merged in.
+def _update_top(sketches, groups, items, counters):
+    if len(groups) == 0:
+        return
+    base = int(items.max()) + 1
+    keys, counts = np.unique(groups * base + items, return_counts=True)
+    chunk_groups, chunk_items = keys // base, keys % base
+    order = np.lexsort((-counts, chunk_groups))
+    chunk_groups, chunk_items, counts = chunk_groups[order], chunk_items[order], counts[order]
+    bounds = np.flatnonzero(np.diff(chunk_groups)) + 1
+    for start, stop in zip(np.r_[0, bounds].tolist(), np.r_[bounds, len(chunk_groups)].tolist()):
+        stop = min(stop, start + counters)
+        group = int(chunk_groups[start])
+        sketch = SpaceSaving.from_counts(counters, chunk_items[start:stop].tolist(), counts[start:stop].tolist())
+        sketches[group] = sketches[group].merge(sketch) if group in sketches else sketch
+
+
+# Fold one chunk of (group, value) join rows into per-group HyperLogLogs
+def _update_distinct(sketches, groups, values, precision):
+    if len(groups) == 0:
+        return
+    chunk_groups, group_index = np.unique(groups, return_inverse=True)
+    for group, sketch in zip(chunk_groups.tolist(), hll_by_group(group_index, values, len(chunk_groups), precision)):
+        sketches[group] = sketches[group].merge(sketch) if group in sketches else sketch
+
+
+# Approximate query_1 for one partition: a space-saving top-k of keywords per reviewer.
+# The join is evaluated chunk_size review edges at a time, so only one chunk of join rows
+# exists next to the sketches.
+def query_1_sketches(arrays, partition=0, partitions=1, counters=32, chunk_size=CHUNK_SIZE):
+    authors, papers = _query_1_drivers(arrays, partition, partitions)
+    top = {}
+    for chunk in _chunks(len(authors), chunk_size):
+        reviewers, keywords = _query_1_join(arrays, authors[chunk], papers[chunk])
+        _update_top(top, reviewers, keywords, counters)
+    return {"top": top}
+
+
+# Approximate query_2 for one partition: a HyperLogLog of authors and a space-saving
+# top-k of co-authors per affiliation, evaluated chunk_size memberships at a time
+def query_2_sketches(arrays, partition=0, partitions=1, counters=32, precision=12, chunk_size=CHUNK_SIZE):
+    authors, affs = _query_2_drivers(arrays, partition, partitions)
+    distinct, top = {}, {}
+    for chunk in _chunks(len(authors), chunk_size):
+        chunk_affs, chunk_authors, co_authors = _query_2_join(arrays, authors[chunk], affs[chunk])
+        _update_distinct(distinct, chunk_affs, chunk_authors, precision)
+        _update_top(top, chunk_affs, co_authors, counters)
+    return {"distinct": distinct, "top": top}
+
+
+# Sketches are mergeable, so partitions do not have to split the groups cleanly
+def merge_sketches(parts):
+    merged = {}
+    for part in parts:
+        for kind, sketches in part.items():
+            target = merged.setdefault(kind, {})
+            for group, sketch in sketches.items():
+                target[group] = target[group].merge(sketch) if group in target else sketch
+    return merged
+
+
+def format_query_1_approximate(arrays, sketches, top_k):
+    labels = arrays.labels
+    rows = []
+    for reviewer in sorted(sketches["top"]):
+        name = labels["author_names"][reviewer]
+        if name is not None:
+            keywords = [labels["keywords"][k] for k, _ in sketches["top"][reviewer].top(top_k)]
+            rows.append((name, ", ".join(keywords)))
+    return pd.DataFrame(rows, columns=['reviewerName', 'expertiseAreas'])
+
+
+def format_query_2_approximate(arrays, sketches, top_k):
+    labels = arrays.labels
+    rows = []
+    for aff in sorted(sketches.get("distinct", {})):
+        name = labels["affiliation_names"][aff]
+        if name is not None:
+            co_authors = [resource_uri("author", labels["authors"][c]) for c, _ in sketches["top"][aff].top(top_k)]
+            rows.append((name, round(sketches["distinct"][aff].estimate()), "; ".join(co_authors)))
+    return pd.DataFrame(rows, columns=['affiliationName', 'researchers', 'collaborators'])
+
+
+# Worker entry point: open the memory-mapped arrays and evaluate one partition
+def _run_partition(task):
+    query, partition, partitions, array_dir, approximate = task
+    arrays = AboxArrays(array_dir)
+    if approximate is not None:
+        if query == "query_1":
+            return query_1_sketches(arrays, partition, partitions, approximate["counters"])
+        return query_2_sketches(arrays, partition, partitions, approximate["counters"], approximate["precision"])
+    if query == "query_1":
+        return query_1_pairs(arrays, partition, partitions)
+    return query_2_rows(arrays, partition, partitions)
+
+
+# Sketch settings for the approximate mode: distinct_error is the target relative standard
+# error of the distinct counts, top_k_error the space-saving error as a fraction of each
+# group's stream (one counter per 1/top_k_error, and never fewer than top_k)
+def approximate_settings(distinct_error=0.02, top_k=10, top_k_error=0.05):
+    return {
+        "precision": hll_precision(distinct_error),
+        "counters": max(top_k, int(np.ceil(1 / top_k_error))),
+        "top_k": top_k,
+    }
+
+
+# Hash-partition the driving entities (reviewers for query_1, affiliations for query_2)
+# across worker processes and merge the per-group results. Groups never span partitions,
+# so the merge is a concatenation and the output equals the serial one.
+# With approximate settings, workers return per-group sketches instead of rows.
+def run_query(query, workers=1, array_dir=ARRAY_DIR, approximate=None):
+    arrays = AboxArrays(array_dir)
+    if workers == 1:
+        parts = [_run_partition((query, 0, 1, array_dir, approximate))]
+    else:
+        tasks = [(query, p, workers, array_dir, approximate) for p in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_partition, tasks))
+
+    if approximate is not None:
+        sketches = merge_sketches(parts)
+        if query == "query_1":
+            return format_query_1_approximate(arrays, sketches, approximate["top_k"])
+        return format_query_2_approximate(arrays, sketches, approximate["top_k"])
+
+    columns = [np.concatenate(column) for column in zip(*parts)]
+    if query == "query_1":
+        return format_query_1(arrays, *columns)
+    return format_query_2(arrays, *columns)
+
+
+def benchmark(max_workers=16, array_dir=ARRAY_DIR):
+    worker_counts = [w for w in (1, 2, 4, 8, 16) if w <= max_workers]
+    print(f"{os.cpu_count()} CPUs available")
+    for query in ("query_1", "query_2"):
+        serial = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            result = run_query(query, workers, array_dir)
+            elapsed = time.perf_counter() - start
+            if serial is None:
+                serial, serial_time = result, elapsed
+            identical = result.equals(serial)
+            print(f"{query} workers={workers:<3} {elapsed:8.3f}s  speedup {serial_time / elapsed:5.2f}x  "
+                  f"rows {len(result)}  identical to serial: {identical}")
+
+
+# Approximate vs exact on the shipped data: relative error of the HyperLogLog distinct
+# counts (query_2) and recall of the space-saving top-k lists against the exact most
+# frequent items per group (query_1 keywords, query_2 co-authors). Recall is only
+# informative for groups with more distinct items than counters (nothing is evicted
+# otherwise), so it is reported for those groups over a range of counter sizes, along
+# with the largest count overestimate as a fraction of the group's stream (bound: 1/counters).
+def accuracy_report(settings, array_dir=ARRAY_DIR):
+    arrays = AboxArrays(array_dir)
+    top_k = settings["top_k"]
+    print(f"HyperLogLog precision {settings['precision']} ({1 << settings['precision']} registers), "
+          f"{settings['counters']} space-saving counters, top-{top_k}")
+    counter_sizes = sorted({top_k, 2 * top_k, settings["counters"]})
+
+    def exact_counts(groups, items):
+        return pd.DataFrame({'group': groups, 'item': items}).value_counts().rename('n').reset_index()
+
+    def report_top(label, counts, build):
+        cardinality = counts.groupby('group')['item'].size()
+        stream = counts.groupby('group')['n'].sum()
+        ranked = counts.sort_values(['group', 'n', 'item'], ascending=[True, False, True])
+        exact_top = ranked.groupby('group')['item'].agg(lambda s: set(s[:top_k])).to_dict()
+        frequency = dict(zip(zip(counts['group'], counts['item']), counts['n']))
+        for counters in counter_sizes:
+            start = time.perf_counter()
+            sketches = build(counters)
+            elapsed = time.perf_counter() - start
+            overflowing = cardinality.index[cardinality > counters]
+            hits = total = 0
+            for group in overflowing:
+                approx = {i for i, _ in sketches[group].top(top_k)}
+                hits += len(approx & exact_top[group])
+                total += len(exact_top[group])
+            max_error = max((c - frequency[(g, i)]) / stream[g]
+                            for g, sketch in sketches.items() for i, c in sketch.counts.items())
+            recall = f"{hits / total:.3f}" if total else "n/a"
+            print(f"{label} counters={counters:<4} top-{top_k} recall {recall} over {len(overflowing)} of "
+                  f"{len(cardinality)} groups with more than {counters} distinct items; "
+                  f"max overestimate {max_error:.4f} of stream (bound {1 / counters:.4f}); {elapsed:.2f}s")
+
+    reviewers, keywords = query_1_stream(arrays)
+    report_top("query_1 keywords", exact_counts(reviewers, keywords),
+               lambda counters: query_1_sketches(arrays, counters=counters)["top"])
+
+    affs, authors, co_authors = query_2_rows(arrays)
+    if len(affs) == 0:
+        print("query_2: no co-authorship rows (author_wrote_paper.csv missing?)")
+        return
+    sketches_2 = query_2_sketches(arrays, counters=settings["counters"], precision=settings["precision"])
+    distinct_counts = pd.DataFrame({'aff': affs, 'author': authors}).groupby('aff')['author'].nunique()
+    errors = np.array([abs(sketches_2["distinct"][a].estimate() - n) / n for a, n in distinct_counts.items()])
+    print(f"query_2 COUNT(DISTINCT ?author) relative error: mean {errors.mean():.4f}, max {errors.max():.4f} "
+          f"over {len(errors)} affiliations")
+    report_top("query_2 co-authors", exact_counts(affs, co_authors),
+               lambda counters: query_2_sketches(arrays, counters=counters, precision=settings["precision"])["top"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the B.3 queries on memory-mapped ABOX arrays")
+    parser.add_argument("query", nargs="?", choices=["query_1", "query_2"])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--export", action="store_true", help="Rebuild the arrays from the CSVs")
+    parser.add_argument("--benchmark", action="store_true", help="Speedup curve over 1-16 workers")
+    parser.add_argument("--approximate", action="store_true",
+                        help="HyperLogLog distinct counts and space-saving top-k lists instead of exact aggregates")
+    parser.add_argument("--distinct-error", type=float, default=0.02, help="Target relative error of distinct counts")
+    parser.add_argument("--top-k", type=int, default=10, help="Items kept in each approximate list")
+    parser.add_argument("--top-k-error", type=float, default=0.05,
+                        help="Space-saving count error as a fraction of the group's stream")
+    parser.add_argument("--accuracy", action="store_true", help="Compare approximate aggregates with exact ones")
+    args = parser.parse_args()
+    settings = approximate_settings(args.distinct_error, args.top_k, args.top_k_error) if args.approximate else None
+
+    if args.export or not (ARRAY_DIR / "labels.json").exists():
+        export_abox_arrays()
+    if args.query:
+        result = run_query(args.query, args.workers, approximate=settings)
+        suffix = "-approximate" if settings else ""
+        output_file = OUTPUT_DIR / f"local-{args.query}{suffix}.csv"
+        result.to_csv(output_file, index=False)
+        print(f"Saved {len(result)} rows to {output_file}")
+    if args.benchmark:
+        benchmark()
+    if args.accuracy:
+        accuracy_report(settings or approximate_settings(args.distinct_error, args.top_k, args.top_k_error))
+
+
+if __name__ == "__main__":
+    main()
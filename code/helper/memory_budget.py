@@ -0,0 +1,123 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from rdflib import Graph, Literal
+
+from helper.triple_sort import ntriples_line
+
+
+class MemoryBudgetExceeded(MemoryError):
+    pass
+
+
+# Per-stage tracemalloc accounting against an optional budget (in MB).
+# With budget_mb=None nothing is traced and stage() only times the stage.
+class StageMemoryTracker:
+    def __init__(self, budget_mb=None):
+        self.budget_bytes = int(budget_mb * 2**20) if budget_mb else None
+        self.stages = []
+        if self.budget_bytes is not None:
+            tracemalloc.start()
+
+    @property
+    def enabled(self):
+        return self.budget_bytes is not None
+
+    def check(self, context=""):
+        if not self.enabled:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if peak > self.budget_bytes:
+            raise MemoryBudgetExceeded(
+                f"Memory budget of {self.budget_bytes / 2**20:.0f} MB exceeded {context}: "
+                f"current {current / 2**20:.0f} MB, peak {peak / 2**20:.0f} MB")
+
+    @contextmanager
+    def stage(self, name):
+        start_time = time.perf_counter()
+        if not self.enabled:
+            yield
+            self.stages.append((name, time.perf_counter() - start_time, None, None))
+            return
+
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        yield
+        after, peak = tracemalloc.get_traced_memory()
+        self.stages.append((name, time.perf_counter() - start_time, after - before, peak))
+        print(f"[memory] {name}: {(after - before) / 2**20:+.1f} MB, "
+              f"held {after / 2**20:.1f} MB, peak {peak / 2**20:.1f} MB")
+        self.check(f"after stage {name}")
+
+    def report(self):
+        print("\n==== Stage Timings ====")
+        for name, elapsed, delta, peak in self.stages:
+            if delta is None:
+                print(f"{name}: {elapsed:.2f}s")
+            else:
+                print(f"{name}: {elapsed:.2f}s, {delta / 2**20:+.1f} MB, peak {peak / 2**20:.1f} MB")
+
+
+# Append-only file holding long text literals; the graph side keeps only
+# (subject, predicate, offset, length) for each offloaded triple
+class TextSideStore:
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+        self._file = open(path, "w+b")
+        self._offset = 0
+
+    def put(self, subject, predicate, text):
+        data = str(text).encode("utf-8")
+        self._file.write(data)
+        self.entries.append((subject, predicate, self._offset, len(data)))
+        self._offset += len(data)
+
+    def get(self, offset, length):
+        self._file.flush()
+        self._file.seek(offset)
+        data = self._file.read(length)
+        self._file.seek(0, 2)
+        return data.decode("utf-8")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def ntriples(self):
+        for subject, predicate, offset, length in self.entries:
+            yield ntriples_line((subject, predicate, Literal(self.get(offset, length))))
+
+    # Turtle accepts N-Triples statements, so offloaded triples can be appended to the serialized ABox
+    def append_to(self, output_file):
+        with open(output_file, "a", encoding="utf-8") as out:
+            out.write("\n")
+            out.writelines(self.ntriples())
+
+    def close(self):
+        self._file.close()
+
+
+# Graph that checks the memory budget as triples are added and optionally routes long
+# plain-text literals of the given predicates to a TextSideStore
+class BudgetedGraph(Graph):
+    def __init__(self, store, tracker, side_store=None, offload_predicates=(), min_offload_length=256, **kwargs):
+        super().__init__(store=store, **kwargs)
+        self.tracker = tracker
+        self.side_store = side_store
+        self.offload_predicates = set(offload_predicates)
+        self.min_offload_length = min_offload_length
+        self._added = 0
+
+    def add(self, triple):
+        subject, predicate, obj = triple
+        if (self.side_store is not None and isinstance(obj, Literal) and predicate in self.offload_predicates
+                and obj.datatype is None and obj.language is None
+                and len(obj) >= self.min_offload_length):
+            self.side_store.put(subject, predicate, obj)
+            return self
+
+        self._added += 1
+        if self._added % 10000 == 0:
+            self.tracker.check(f"after {self._added} triples")
+        return super().add((subject, predicate, obj))
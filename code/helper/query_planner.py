@@ -0,0 +1,222 @@
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+
+from helper.data_io import OUTPUT_DIR, RESEARCH_NS, load_query
+
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+TOKEN_PATTERN = re.compile(r'<[^>]*>|"(?:[^"\\]|\\.)*"|[^\s;.,{}]+|[;.,]')
+# Steps of a sequence path; '/' inside <...> IRIs is not a separator
+PATH_STEP_PATTERN = re.compile(r'<[^>]*>|[^/<]+')
+PREFIX_PATTERN = re.compile(r'PREFIX\s+([\w-]*):\s*<([^>]*)>', re.IGNORECASE)
+DEFAULT_PREFIXES = {
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "owl": "http://www.w3.org/2002/07/owl#",
+}
+
+
+# Statistics key of a predicate or class IRI: the local name for research: terms (as in the
+# "classes"/"properties" counts), the full IRI for everything else (rdf:type, rdfs:label, ...)
+def predicate_key(iri):
+    iri = str(iri)
+    return iri[len(RESEARCH_NS):] if iri.startswith(RESEARCH_NS) else iri
+
+
+# Per-predicate triple count and distinct subject/object counts; stored in
+# abox_stats.json under "predicate_stats" so queries can be planned without the graph.
+# Triples offloaded to a TextSideStore (--offload-text) are counted too; their texts are
+# not read back, so each one is assumed to be a distinct object.
+def predicate_statistics(graph, side_store=None):
+    offloaded = {}
+    if side_store is not None:
+        for subject, predicate, _, _ in side_store.entries:
+            offloaded.setdefault(predicate, []).append(subject)
+
+    stats = {}
+    for predicate in set(graph.predicates()) | set(offloaded):
+        subjects, objects, triples = set(), set(), 0
+        for s, _, o in graph.triples((None, predicate, None)):
+            subjects.add(s)
+            objects.add(o)
+            triples += 1
+        side_subjects = offloaded.get(predicate, [])
+        subjects.update(side_subjects)
+        stats[predicate_key(predicate)] = {
+            "triples": triples + len(side_subjects),
+            "distinct_subjects": len(subjects),
+            "distinct_objects": len(objects) + len(side_subjects),
+        }
+    return stats
+
+
+def load_stats(stats_file=OUTPUT_DIR / "abox_stats.json"):
+    with open(stats_file) as f:
+        stats = json.load(f)
+    if "predicate_stats" not in stats:
+        # Older stats files only have triple counts; assume no repeated subjects/objects
+        print("Warning: no predicate_stats in abox_stats.json, using triple counts only")
+        stats["predicate_stats"] = {
+            name: {"triples": n, "distinct_subjects": n, "distinct_objects": n}
+            for name, n in stats.get("properties", {}).items()
+        }
+    return stats
+
+
+def _is_var(term):
+    return term.startswith('?') or term.startswith('$')
+
+
+# Split a query into (prefix and select part, list of triple patterns, trailing clauses).
+# Handles the subset of SPARQL the B.3 queries use: ';' and ',' lists, sequence paths (a/b) and FILTERs.
+def parse_query(query_text):
+    where = re.search(r'WHERE\s*\{', query_text, re.IGNORECASE)
+    body_start = where.end()
+    body_end = query_text.rindex('}')
+    head, body, tail = query_text[:where.start()], query_text[body_start:body_end], query_text[body_end + 1:]
+
+    filters = re.findall(r'FILTER\s*\((?:[^()]|\([^()]*\))*\)', body, re.IGNORECASE)
+    for f in filters:
+        body = body.replace(f, ' ')
+
+    patterns, current, last, path_vars = [], [], [], 0
+    for token in TOKEN_PATTERN.findall(body):
+        if token == ';':
+            current = last[:1]
+        elif token == ',':
+            current = last[:2]
+        elif token == '.':
+            current = []
+        else:
+            current.append(token)
+            if len(current) == 3:
+                subject, predicate, obj = current
+                last = current
+                steps = PATH_STEP_PATTERN.findall(predicate)
+                for i, step in enumerate(steps):
+                    if i < len(steps) - 1:
+                        path_vars += 1
+                        next_subject = f"?_path{path_vars}"
+                    else:
+                        next_subject = obj
+                    patterns.append((subject, step, next_subject))
+                    subject = next_subject
+                current = current[:1]
+    return head, patterns, filters, tail
+
+
+def query_prefixes(query_text):
+    return {**DEFAULT_PREFIXES, **dict(PREFIX_PATTERN.findall(query_text))}
+
+
+# Statistics key of a predicate or class as written in the query ('a', prefixed name or <IRI>)
+def _predicate_key(term, prefixes):
+    if term == 'a':
+        return predicate_key(RDF_TYPE)
+    if term.startswith('<'):
+        return predicate_key(term.strip('<>'))
+    prefix, _, local = term.partition(':')
+    return predicate_key(prefixes.get(prefix, prefix + ':') + local)
+
+
+# Estimated number of matches for a pattern given the variables already bound
+def pattern_cardinality(pattern, bound, stats, prefixes=DEFAULT_PREFIXES):
+    subject, predicate, obj = pattern
+    key = _predicate_key(predicate, prefixes)
+    if key == RDF_TYPE and not _is_var(obj):
+        return stats["classes"].get(_predicate_key(obj, prefixes), 1), 1, 1
+
+    # Predicates without statistics are assumed to be as large as the whole ABOX
+    total = stats.get("total_triples", 1)
+    pstats = stats["predicate_stats"].get(key, {"triples": total, "distinct_subjects": total, "distinct_objects": total})
+    triples = max(pstats["triples"], 1)
+    subject_bound = not _is_var(subject) or subject in bound
+    object_bound = not _is_var(obj) or obj in bound
+    if subject_bound and object_bound:
+        return triples / (max(pstats["distinct_subjects"], 1) * max(pstats["distinct_objects"], 1)), subject_bound, object_bound
+    if subject_bound:
+        return triples / max(pstats["distinct_subjects"], 1), subject_bound, object_bound
+    if object_bound:
+        return triples / max(pstats["distinct_objects"], 1), subject_bound, object_bound
+    return triples, subject_bound, object_bound
+
+
+# Greedy join ordering: start from the most selective pattern, then repeatedly add the
+# connected pattern that gives the smallest estimated intermediate result
+def order_patterns(patterns, stats, prefixes=DEFAULT_PREFIXES):
+    remaining = list(patterns)
+    bound, plan, size = set(), [], 1.0
+    while remaining:
+        connected = [p for p in remaining if not bound or any(t in bound for t in (p[0], p[2]))] or remaining
+        best = min(connected, key=lambda p: size * pattern_cardinality(p, bound, stats, prefixes)[0])
+        card = pattern_cardinality(best, bound, stats, prefixes)[0]
+        size = size * card if bound else card
+        plan.append((best, card, size))
+        bound.update(t for t in (best[0], best[2]) if _is_var(t))
+        remaining.remove(best)
+    return plan
+
+
+def write_query(head, plan, filters, tail, annotate=True):
+    lines = [head.rstrip(), "WHERE {"]
+    for (subject, predicate, obj), card, size in plan:
+        line = f"{subject} {predicate} {obj} ."
+        if annotate:
+            line += f"  # fan-out ~{card:.1f}, intermediate ~{size:,.0f}"
+        lines.append(line)
+    lines.extend(filters)
+    lines.append("}" + tail)
+    return "\n".join(lines)
+
+
+def plan_query(query_text, stats, annotate=True):
+    head, patterns, filters, tail = parse_query(query_text)
+    plan = order_patterns(patterns, stats, query_prefixes(head))
+    return write_query(head, plan, filters, tail, annotate), plan
+
+
+def benchmark(query_files, stats, abox_file=OUTPUT_DIR / "abox.ttl", repeats=3):
+    from rdflib import Graph
+
+    print(f"Loading {abox_file}...")
+    g = Graph()
+    g.parse(str(abox_file), format="turtle")
+
+    print("\n==== Query plan benchmark ====")
+    for query_file in query_files:
+        original = load_query(query_file)
+        planned, _ = plan_query(original, stats, annotate=False)
+        for label, text in (("written order", original), ("planned order", planned)):
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                rows = list(g.query(text))
+                timings.append(time.perf_counter() - start)
+            print(f"{query_file} ({label}): best of {repeats} {min(timings):.3f}s, {len(rows)} rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reorder the B.3 query patterns by estimated selectivity")
+    parser.add_argument("queries", nargs="*", default=["query_1.sparql", "query_2.sparql"])
+    parser.add_argument("--benchmark", action="store_true", help="Time written vs planned order on abox.ttl")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR,
+                        help="Directory for the *_planned.sparql files (not the tracked query directory)")
+    args = parser.parse_args()
+
+    stats = load_stats()
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    for query_file in args.queries:
+        planned, _ = plan_query(load_query(query_file), stats)
+        output_file = args.output_dir / query_file.replace(".sparql", "_planned.sparql")
+        with open(output_file, "w") as f:
+            f.write(planned)
+        print(f"==== {query_file} -> {output_file} ====\n{planned}\n")
+
+    if args.benchmark:
+        benchmark(args.queries, stats)
+
+
+if __name__ == "__main__":
+    main()
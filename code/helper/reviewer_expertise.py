@@ -0,0 +1,179 @@
+import argparse
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from helper.csv_delta import write_update_operations
+from helper.data_io import load_csv, load_query, OUTPUT_DIR
+from helper.triple_mappings import expertise_triples
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Parquet when pyarrow is available, CSV otherwise
+TABLE_SUFFIX = ".parquet" if pa is not None else ".csv"
+EXPERTISE_FILE = f"reviewer_expertise{TABLE_SUFFIX}"
+# Review edges already counted in the expertise table, so re-delivered edges are not counted twice
+EDGES_FILE = f"reviewer_expertise_edges{TABLE_SUFFIX}"
+
+
+def _write_table(df, path):
+    if pa is not None:
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def _read_table(path):
+    if pa is not None:
+        return pd.read_parquet(path)
+    df = pd.read_csv(path, dtype=str)
+    if 'reviews' in df:
+        df['reviews'] = df['reviews'].astype(int)
+    return df
+
+
+# Reviewer -> paper edges, taken from the generated Review model
+# (author_reviewed_review + review_reviews_paper), falling back to author_reviewed_paper.csv
+def load_review_edges():
+    reviewed_df = load_csv("author_reviewed_review.csv", generated=True)
+    reviews_df = load_csv("review_reviews_paper.csv", generated=True)
+    if len(reviewed_df) > 0 and len(reviews_df) > 0:
+        return reviewed_df.merge(reviews_df, on='reviewId')[['authorId', 'paperId']]
+    return load_csv("author_reviewed_paper.csv")[['authorId', 'paperId']]
+
+
+def _distinct_edges(review_edges_df):
+    return review_edges_df[['authorId', 'paperId']].dropna().drop_duplicates()
+
+
+# Reviewer expertise table: one row per (reviewer, keyword) with the number of distinct
+# papers the reviewer reviewed that are related to that keyword
+def build_reviewer_expertise(review_edges_df, paper_keyword_df):
+    if len(review_edges_df) == 0 or len(paper_keyword_df) == 0:
+        return pd.DataFrame(columns=['authorId', 'keywordId', 'reviews'])
+
+    joined = _distinct_edges(review_edges_df).merge(
+        paper_keyword_df[['paperId', 'keywordId']].drop_duplicates(), on='paperId')
+    expertise_df = joined.groupby(['authorId', 'keywordId'], sort=False).size()
+    return expertise_df.rename('reviews').reset_index()
+
+
+# Fold newly arrived review edges into an existing expertise table. Edges already in
+# counted_edges_df are skipped. Returns the updated table, the updated counted edges and
+# the (authorId, keywordId) pairs that are new to the table, i.e. the has_expertise
+# triples to insert (counts of existing pairs change, their triples do not).
+def update_reviewer_expertise(expertise_df, counted_edges_df, new_review_edges_df, paper_keyword_df):
+    new_edges_df = _distinct_edges(new_review_edges_df).merge(
+        counted_edges_df[['authorId', 'paperId']], how='left', indicator=True)
+    new_edges_df = new_edges_df[new_edges_df['_merge'] == 'left_only'].drop(columns='_merge')
+    counted_edges_df = pd.concat([counted_edges_df[['authorId', 'paperId']], new_edges_df], ignore_index=True)
+
+    delta_df = build_reviewer_expertise(new_edges_df, paper_keyword_df)
+    added_df = delta_df[['authorId', 'keywordId']].merge(
+        expertise_df[['authorId', 'keywordId']], how='left', indicator=True)
+    added_df = added_df[added_df['_merge'] == 'left_only'].drop(columns='_merge')
+
+    if len(expertise_df) > 0:
+        merged = pd.concat([expertise_df, delta_df], ignore_index=True)
+        delta_df = merged.groupby(['authorId', 'keywordId'], sort=False)['reviews'].sum().reset_index()
+    return delta_df, counted_edges_df, added_df
+
+
+def save_reviewer_expertise(expertise_df, counted_edges_df):
+    output_file = OUTPUT_DIR / EXPERTISE_FILE
+    _write_table(expertise_df, output_file)
+    _write_table(_distinct_edges(counted_edges_df), OUTPUT_DIR / EDGES_FILE)
+    print(f"Saved reviewer expertise to {output_file}, {len(expertise_df)} rows")
+
+
+def load_reviewer_expertise():
+    try:
+        return _read_table(OUTPUT_DIR / EXPERTISE_FILE), _read_table(OUTPUT_DIR / EDGES_FILE)
+    except Exception as e:
+        print(f"Warning: Could not load {EXPERTISE_FILE}: {e}")
+        return (pd.DataFrame(columns=['authorId', 'keywordId', 'reviews']),
+                pd.DataFrame(columns=['authorId', 'paperId']))
+
+
+# Incremental build: fold a CSV of new (authorId, paperId) review edges into the saved
+# table and write the has_expertise triples it adds as SPARQL INSERT DATA operations
+def apply_new_reviews(new_edges_file, output_file, batch_size=1000):
+    start = time.perf_counter()
+    expertise_df, counted_edges_df = load_reviewer_expertise()
+    new_edges_df = pd.read_csv(new_edges_file, dtype=str)
+    expertise_df, counted_edges_df, added_df = update_reviewer_expertise(
+        expertise_df, counted_edges_df, new_edges_df, load_csv("paper_isRelatedTo_keyword.csv"))
+    save_reviewer_expertise(expertise_df, counted_edges_df)
+
+    inserted = [t for row in added_df.to_dict('records') for t in expertise_triples(row)]
+    write_update_operations([], inserted, output_file, batch_size)
+    print(f"Folded {len(new_edges_df)} review edges in {time.perf_counter() - start:.2f}s")
+
+
+# Equivalent of query_1.sparql: reviewer name and the distinct keywords of the reviewed papers
+def expertise_areas(expertise_df, authors_df, keywords_df):
+    named = expertise_df.merge(authors_df[['authorId', 'name']].dropna(), on='authorId')
+    named = named.merge(keywords_df[['keywordId', 'keyword']].dropna(), on='keywordId')
+    result = named.groupby(['authorId', 'name'], sort=False)['keyword'].agg(
+        lambda s: ", ".join(s.drop_duplicates()))
+    return result.reset_index().rename(columns={'name': 'reviewerName', 'keyword': 'expertiseAreas'})[
+        ['reviewerName', 'expertiseAreas']]
+
+
+# Compare against a stored query result; keyword order in GROUP_CONCAT is not defined,
+# so each row is compared as (reviewerName, set of keywords)
+def matches_query_result(areas_df, result_file=OUTPUT_DIR / "query-result_1.csv"):
+    expected_df = pd.read_csv(result_file, dtype=str, keep_default_na=False)
+
+    def as_multiset(df):
+        rows = [(name, frozenset(areas.split(", "))) for name, areas in zip(df['reviewerName'], df['expertiseAreas'])]
+        return pd.Series(rows).value_counts().to_dict()
+
+    return as_multiset(areas_df) == as_multiset(expected_df)
+
+
+def benchmark(abox_file=OUTPUT_DIR / "abox.ttl"):
+    from rdflib import Graph
+
+    paper_keyword_df = load_csv("paper_isRelatedTo_keyword.csv")
+    authors_df = load_csv("author.csv")
+    keywords_df = load_csv("keyword.csv")
+
+    start = time.perf_counter()
+    expertise_df = build_reviewer_expertise(load_review_edges(), paper_keyword_df)
+    areas_df = expertise_areas(expertise_df, authors_df, keywords_df)
+    table_time = time.perf_counter() - start
+    print(f"Matches query-result_1.csv: {matches_query_result(areas_df)}")
+
+    print(f"Loading {abox_file}...")
+    g = Graph()
+    g.parse(str(abox_file), format="turtle")
+    start = time.perf_counter()
+    rows = list(g.query(load_query("query_1.sparql")))
+    query_time = time.perf_counter() - start
+
+    print("\n==== query_1 benchmark ====")
+    print(f"Four-hop join (SPARQL):      {query_time:.3f}s, {len(rows)} rows")
+    print(f"Expertise table (pandas):    {table_time:.3f}s, {len(areas_df)} rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reviewer expertise table: benchmark or incremental update")
+    parser.add_argument("--update", type=Path, metavar="NEW_REVIEWS_CSV",
+                        help="CSV of new authorId,paperId review edges to fold into the saved table")
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR / "expertise_delta.ru")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Triples per INSERT DATA operation")
+    args = parser.parse_args()
+
+    if args.update:
+        apply_new_reviews(args.update, args.output, args.batch_size)
+    else:
+        benchmark()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from helper.data_io import load_csv, OUTPUT_DIR
+from helper.reviewer_expertise import build_reviewer_expertise, load_review_edges
+
+RECOMMENDATIONS_FILE = "reviewer_recommendations.csv"
+
+
+def _incidence(rows, cols, row_index, col_index, values=None):
+    row_codes = row_index.get_indexer(rows)
+    col_codes = col_index.get_indexer(cols)
+    known = (row_codes >= 0) & (col_codes >= 0)
+    if values is None:
+        values = np.ones(len(row_codes), dtype=np.float32)
+    matrix = sparse.csr_matrix(
+        (np.asarray(values, dtype=np.float32)[known], (row_codes[known], col_codes[known])),
+        shape=(len(row_index), len(col_index)),
+    )
+    matrix.sum_duplicates()
+    return matrix
+
+
+# Scale keyword columns by inverse document frequency (over papers) and L2-normalize rows
+def _tfidf(matrix, idf):
+    weighted = sparse.csr_matrix(matrix @ sparse.diags(idf))
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ weighted, dtype=np.float32)
+
+
+# Paper x reviewer matrix of conflicts of interest: the reviewer wrote the paper,
+# is its corresponding author, or shares an affiliation with one of its authors
+def conflict_matrix(paper_index, reviewer_index, wrote_df, corresponded_df, affiliated_df):
+    wrote_df = wrote_df.reindex(columns=['paperId', 'authorId'])
+    corresponded_df = corresponded_df.reindex(columns=['paperId', 'authorId'])
+    affiliated_df = affiliated_df.reindex(columns=['authorId', 'affId'])
+
+    wrote = _incidence(wrote_df['paperId'], wrote_df['authorId'], paper_index, reviewer_index)
+    corresponded = _incidence(corresponded_df['paperId'], corresponded_df['authorId'], paper_index, reviewer_index)
+
+    affiliation_index = pd.Index(affiliated_df['affId'].dropna().unique())
+    all_authors = pd.Index(pd.unique(pd.concat([wrote_df['authorId'], affiliated_df['authorId']])))
+    paper_author = _incidence(wrote_df['paperId'], wrote_df['authorId'], paper_index, all_authors)
+    author_affiliation = _incidence(affiliated_df['authorId'], affiliated_df['affId'], all_authors, affiliation_index)
+    reviewer_affiliation = _incidence(affiliated_df['authorId'], affiliated_df['affId'], reviewer_index, affiliation_index)
+    shared_affiliation = (paper_author @ author_affiliation) @ reviewer_affiliation.T
+
+    return (wrote + corresponded + shared_affiliation).tocsr()
+
+
+# Top-k reviewers per paper by cosine similarity of TF-IDF keyword vectors.
+# Similarities are computed block by block (block_size papers at a time) so only
+# a block_size x reviewers dense array is ever held in memory. Reviewers who already
+# reviewed a paper are excluded like conflicts unless exclude_assigned is False.
+def recommend_reviewers(paper_keyword_df, review_edges_df, wrote_df, corresponded_df, affiliated_df,
+                        k=10, block_size=2000, exclude_assigned=True):
+    paper_keyword_df = paper_keyword_df[['paperId', 'keywordId']].dropna().drop_duplicates()
+    expertise_df = build_reviewer_expertise(review_edges_df, paper_keyword_df)
+
+    paper_index = pd.Index(paper_keyword_df['paperId'].unique())
+    keyword_index = pd.Index(paper_keyword_df['keywordId'].unique())
+    reviewer_index = pd.Index(expertise_df['authorId'].unique())
+
+    paper_keywords = _incidence(paper_keyword_df['paperId'], paper_keyword_df['keywordId'], paper_index, keyword_index)
+    reviewer_keywords = _incidence(expertise_df['authorId'], expertise_df['keywordId'], reviewer_index, keyword_index,
+                                   values=expertise_df['reviews'].to_numpy())
+
+    document_frequency = np.asarray((paper_keywords > 0).sum(axis=0)).ravel()
+    idf = np.log((1 + len(paper_index)) / (1 + document_frequency)) + 1.0
+    papers = _tfidf(paper_keywords, idf)
+    reviewers_t = _tfidf(reviewer_keywords, idf).T.tocsr()
+    conflicts = conflict_matrix(paper_index, reviewer_index, wrote_df, corresponded_df, affiliated_df)
+    if exclude_assigned:
+        assigned = _incidence(review_edges_df['paperId'], review_edges_df['authorId'], paper_index, reviewer_index)
+        conflicts = (conflicts + assigned).tocsr()
+
+    k = min(k, len(reviewer_index))
+    results = []
+    for start in range(0, len(paper_index), block_size):
+        stop = min(start + block_size, len(paper_index))
+        scores = (papers[start:stop] @ reviewers_t).toarray()
+        conflict_rows, conflict_cols = conflicts[start:stop].nonzero()
+        scores[conflict_rows, conflict_cols] = 0.0
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        block_df = pd.DataFrame({
+            'paperId': np.repeat(paper_index[start:stop], k),
+            'reviewerId': reviewer_index[top.ravel()],
+            'rank': np.tile(np.arange(1, k + 1), stop - start),
+            'score': top_scores.ravel(),
+        })
+        results.append(block_df[block_df['score'] > 0])
+
+    if not results:
+        return pd.DataFrame(columns=['paperId', 'reviewerId', 'rank', 'score'])
+    return pd.concat(results, ignore_index=True)
+
+
+def save_recommendations(recommendations_df):
+    output_file = OUTPUT_DIR / RECOMMENDATIONS_FILE
+    recommendations_df.to_csv(output_file, index=False)
+    print(f"Saved reviewer recommendations to {output_file}, {len(recommendations_df)} rows")
+
+
+def main(k=10):
+    paper_keyword_df = load_csv("paper_isRelatedTo_keyword.csv")
+    review_edges_df = load_review_edges()
+    wrote_df = load_csv("author_wrote_paper.csv")
+    corresponded_df = load_csv("paper_correspondedBy_author.csv")
+    affiliated_df = load_csv("author_affiliatedWith_affiliation.csv")
+
+    start = time.perf_counter()
+    recommendations_df = recommend_reviewers(paper_keyword_df, review_edges_df, wrote_df,
+                                             corresponded_df, affiliated_df, k=k)
+    elapsed = time.perf_counter() - start
+
+    papers = recommendations_df['paperId'].nunique()
+    print(f"Top-{k} recommendations for {papers} papers in {elapsed:.2f}s")
+    save_recommendations(recommendations_df)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import math
+
+import numpy as np
+
+
+def splitmix64(values):
+    x = np.asarray(values).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+# HyperLogLog precision for a target relative standard error (1.04 / sqrt(2^p))
+def hll_precision(relative_error):
+    return min(18, max(4, math.ceil(math.log2((1.04 / relative_error) ** 2))))
+
+
+def _hll_alpha(m):
+    if m == 16:
+        return 0.673
+    if m == 32:
+        return 0.697
+    if m == 64:
+        return 0.709
+    return 0.7213 / (1 + 1.079 / m)
+
+
+# Register index and rank (position of the leftmost 1-bit) for each 64-bit hash
+def _hll_positions(hashes, precision):
+    index = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    remaining = hashes & np.uint64((1 << (64 - precision)) - 1)
+    bit_length = np.zeros(len(remaining), dtype=np.int64)
+    nonzero = remaining > 0
+    bit_length[nonzero] = np.frexp(remaining[nonzero].astype(np.float64))[1]
+    rank = (64 - precision) - bit_length + 1
+    return index, rank.astype(np.uint8)
+
+
+class HyperLogLog:
+    def __init__(self, precision=12, registers=None):
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, values):
+        index, rank = _hll_positions(splitmix64(values), self.precision)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def estimate(self):
+        m = len(self.registers)
+        raw = _hll_alpha(m) * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            return m * math.log(m / zeros)
+        return raw
+
+    @property
+    def nbytes(self):
+        return self.registers.nbytes
+
+
+# One HyperLogLog per group, filled in a single vectorized pass
+def hll_by_group(group_index, values, n_groups, precision):
+    registers = np.zeros((n_groups, 1 << precision), dtype=np.uint8)
+    index, rank = _hll_positions(splitmix64(values), precision)
+    np.maximum.at(registers, (np.asarray(group_index), index), rank)
+    return [HyperLogLog(precision, row) for row in registers]
+
+
+# Space-saving heavy hitters: at most k counters; every count overestimates the true
+# frequency by at most the smallest counter (<= total / k)
+class SpaceSaving:
+    def __init__(self, k):
+        self.k = k
+        self.counts = {}
+        self.errors = {}
+
+    @classmethod
+    def for_error(cls, epsilon):
+        return cls(math.ceil(1 / epsilon))
+
+    # Summary of exactly counted items (one chunk of a stream), keeping the k most frequent;
+    # every dropped item occurred at most as often as the smallest kept counter
+    @classmethod
+    def from_counts(cls, k, items, counts):
+        sketch = cls(k)
+        ranked = sorted(zip(items, counts), key=lambda item: -item[1])[:k]
+        sketch.counts = dict(ranked)
+        sketch.errors = dict.fromkeys(sketch.counts, 0)
+        return sketch
+
+    def update(self, item, weight=1):
+        if item in self.counts:
+            self.counts[item] += weight
+        elif len(self.counts) < self.k:
+            self.counts[item] = weight
+            self.errors[item] = 0
+        else:
+            victim = min(self.counts, key=self.counts.get)
+            floor = self.counts.pop(victim)
+            self.errors.pop(victim)
+            self.counts[item] = floor + weight
+            self.errors[item] = floor
+
+    def _floor(self):
+        return min(self.counts.values()) if len(self.counts) >= self.k else 0
+
+    # Mergeable summaries: an item missing from one side may have occurred there up to
+    # that side's smallest counter, so that floor is added before truncating to k
+    def merge(self, other):
+        merged = SpaceSaving(max(self.k, other.k))
+        own_floor, other_floor = self._floor(), other._floor()
+        for item in set(self.counts) | set(other.counts):
+            merged.counts[item] = self.counts.get(item, own_floor) + other.counts.get(item, other_floor)
+            merged.errors[item] = self.errors.get(item, own_floor) + other.errors.get(item, other_floor)
+        if len(merged.counts) > merged.k:
+            keep = sorted(merged.counts, key=lambda i: -merged.counts[i])[:merged.k]
+            merged.counts = {i: merged.counts[i] for i in keep}
+            merged.errors = {i: merged.errors[i] for i in keep}
+        return merged
+
+    def top(self, n=None):
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:n] if n else ranked
@@ -0,0 +1,225 @@
+import argparse
+import bisect
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from helper.data_io import load_csv, OUTPUT_DIR
+
+INDEX_DIR = OUTPUT_DIR / "text_index"
+
+# Per-field boosts: keyword.csv terms attached through related_to count most
+FIELD_WEIGHTS = {"keyword": 3.0, "title": 2.0, "abstract": 1.0}
+STOPWORDS = frozenset("a an and are as at be by for from in is it of on or that the this to was were with".split())
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    if not isinstance(text, str):
+        return []
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+# One (paperId, text) frame per field
+def paper_fields(papers_df, paper_keyword_df, keywords_df):
+    fields = {
+        "title": papers_df[['paperId', 'title']].rename(columns={'title': 'text'}),
+        "abstract": papers_df[['paperId', 'abstract']].rename(columns={'abstract': 'text'}),
+    }
+    if len(paper_keyword_df) > 0 and len(keywords_df) > 0:
+        fields["keyword"] = paper_keyword_df[['paperId', 'keywordId']].merge(
+            keywords_df[['keywordId', 'keyword']], on='keywordId')[['paperId', 'keyword']].rename(columns={'keyword': 'text'})
+    return fields
+
+
+# Write one immutable segment: sorted vocabulary, CSR-style offsets into the posting
+# arrays (doc numbers and scores) and the paperIds of the documents it covers
+def write_segment(segment_dir, fields):
+    postings = defaultdict(lambda: defaultdict(float))
+    doc_ids = pd.Index(pd.unique(pd.concat([df['paperId'] for df in fields.values()])))
+    for field, df in fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for doc, text in zip(doc_ids.get_indexer(df['paperId']), df['text']):
+            for term in tokenize(text):
+                postings[term][doc] += weight
+
+    terms = sorted(postings)
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    docs, scores = [], []
+    for i, term in enumerate(terms):
+        entries = sorted(postings[term].items())
+        docs.extend(d for d, _ in entries)
+        scores.extend(w for _, w in entries)
+        offsets[i + 1] = len(docs)
+
+    segment_dir.mkdir(parents=True, exist_ok=True)
+    np.save(segment_dir / "offsets.npy", offsets)
+    np.save(segment_dir / "docs.npy", np.asarray(docs, dtype=np.int32))
+    np.save(segment_dir / "scores.npy", np.asarray(scores, dtype=np.float32))
+    (segment_dir / "terms.txt").write_text("\n".join(terms), encoding="utf-8")
+    (segment_dir / "papers.txt").write_text("\n".join(doc_ids), encoding="utf-8")
+    return len(doc_ids), len(terms), len(docs)
+
+
+class _Segment:
+    def __init__(self, segment_dir):
+        self.terms = (segment_dir / "terms.txt").read_text(encoding="utf-8").split("\n")
+        self.papers = np.asarray((segment_dir / "papers.txt").read_text(encoding="utf-8").split("\n"))
+        self.offsets = np.load(segment_dir / "offsets.npy", mmap_mode="r")
+        self.docs = np.load(segment_dir / "docs.npy", mmap_mode="r")
+        self.scores = np.load(segment_dir / "scores.npy", mmap_mode="r")
+
+    def _term_range(self, term, prefix=False):
+        lo = bisect.bisect_left(self.terms, term)
+        if not prefix:
+            return lo, lo + 1 if lo < len(self.terms) and self.terms[lo] == term else lo
+        hi = bisect.bisect_left(self.terms, term + "\uffff")
+        return lo, hi
+
+    # {paperId: score} for a term (or every term starting with it)
+    def postings(self, term, prefix=False):
+        lo, hi = self._term_range(term, prefix)
+        if lo >= hi:
+            return {}
+        # Postings of consecutive terms are contiguous, so a prefix range is a single slice
+        start, stop = self.offsets[lo], self.offsets[hi]
+        docs, inverse = np.unique(self.docs[start:stop], return_inverse=True)
+        scores = np.bincount(inverse, weights=self.scores[start:stop])
+        return dict(zip(self.papers[docs].tolist(), scores.tolist()))
+
+
+# Memory-mapped inverted index made of segments; later segments (incremental updates)
+# replace the postings of any paper they contain
+class TextIndex:
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = Path(index_dir)
+        self.segments = [_Segment(d) for d in sorted(self.index_dir.glob("segment_*"))]
+        self._superseded = []
+        newer = set()
+        for segment in reversed(self.segments):
+            self._superseded.insert(0, set(newer))
+            newer.update(segment.papers)
+
+    def _lookup(self, term, prefix=False):
+        result = defaultdict(float)
+        for segment, superseded in zip(self.segments, self._superseded):
+            for paper, score in segment.postings(term, prefix).items():
+                if paper not in superseded:
+                    result[paper] += score
+        return result
+
+    # Boolean query: terms are ANDed, "OR" between terms unions them, "-term" excludes
+    # and "term*" matches every term with that prefix. Returns [(paperId, score)] best first.
+    def search(self, query, limit=10):
+        groups, current, excluded = [], [], set()
+        for word in query.split():
+            if word == "OR":
+                groups.append(current)
+                current = []
+                continue
+            negate = word.startswith("-")
+            prefix = word.endswith("*")
+            tokens = tokenize(word.strip("-*"))
+            if not tokens:
+                continue
+            # A word that tokenizes into several terms (e.g. "covid-19") needs all of them;
+            # the prefix applies to the last one
+            postings = self._lookup(tokens[0], prefix and len(tokens) == 1)
+            for i, token in enumerate(tokens[1:], start=2):
+                extra = self._lookup(token, prefix and i == len(tokens))
+                postings = {p: s + extra[p] for p, s in postings.items() if p in extra}
+            if negate:
+                excluded.update(postings)
+            else:
+                current.append(postings)
+        groups.append(current)
+
+        scores = defaultdict(float)
+        for group in groups:
+            if not group:
+                continue
+            matched = set(group[0]).intersection(*group[1:])
+            for paper in matched:
+                scores[paper] += sum(p[paper] for p in group)
+        ranked = sorted(((p, s) for p, s in scores.items() if p not in excluded), key=lambda x: -x[1])
+        return ranked[:limit] if limit else ranked
+
+
+def _next_segment_dir(index_dir):
+    existing = sorted(Path(index_dir).glob("segment_*"))
+    number = int(existing[-1].name.split("_")[1]) + 1 if existing else 0
+    return Path(index_dir) / f"segment_{number:05d}"
+
+
+def build_text_index(papers_df, paper_keyword_df, keywords_df, index_dir=INDEX_DIR):
+    for segment_dir in Path(index_dir).glob("segment_*"):
+        for f in segment_dir.iterdir():
+            f.unlink()
+        segment_dir.rmdir()
+    return add_to_text_index(papers_df, paper_keyword_df, keywords_df, index_dir)
+
+
+# Incremental update: new or changed papers go into a new segment
+def add_to_text_index(papers_df, paper_keyword_df, keywords_df, index_dir=INDEX_DIR):
+    segment_dir = _next_segment_dir(index_dir)
+    docs, terms, postings = write_segment(segment_dir, paper_fields(papers_df, paper_keyword_df, keywords_df))
+    print(f"Wrote text index segment {segment_dir}: {docs} papers, {terms} terms, {postings} postings")
+    return segment_dir
+
+
+# Compare index lookups with the SPARQL FILTER(CONTAINS(...)) scan over titles and abstracts
+def benchmark(terms=("protein", "neural", "cancer", "climate"), abox_file=OUTPUT_DIR / "abox.ttl"):
+    from rdflib import Graph
+
+    index = TextIndex()
+    print(f"Loading {abox_file}...")
+    g = Graph()
+    g.parse(str(abox_file), format="turtle")
+
+    print(f"{'term':<12} {'index (ms)':>11} {'hits':>6} {'SPARQL (ms)':>12} {'hits':>6}")
+    for term in terms:
+        start = time.perf_counter()
+        hits = index.search(term, limit=None)
+        index_time = (time.perf_counter() - start) * 1000
+
+        query = f"""
+        PREFIX research: <http://example.org/research#>
+        SELECT DISTINCT ?paper WHERE {{
+            ?paper a research:Paper .
+            OPTIONAL {{ ?paper research:title ?title }}
+            OPTIONAL {{ ?paper research:abstract ?abstract }}
+            FILTER(CONTAINS(LCASE(COALESCE(?title, "")), "{term}") || CONTAINS(LCASE(COALESCE(?abstract, "")), "{term}"))
+        }}"""
+        start = time.perf_counter()
+        rows = list(g.query(query))
+        sparql_time = (time.perf_counter() - start) * 1000
+        print(f"{term:<12} {index_time:>11.2f} {len(hits):>6} {sparql_time:>12.2f} {len(rows):>6}")
+    print("(Index hits also include keyword matches; SPARQL CONTAINS also matches inside words.)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query or benchmark the paper text index")
+    parser.add_argument("query", nargs="?", help='e.g. "neural network -survey" or "genom* OR protein"')
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--build", action="store_true", help="Rebuild the index from the CSVs")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.build:
+        build_text_index(load_csv("paper.csv"), load_csv("paper_isRelatedTo_keyword.csv"), load_csv("keyword.csv"))
+    if args.query:
+        start = time.perf_counter()
+        results = TextIndex().search(args.query, limit=args.limit)
+        print(f"{len(results)} results in {(time.perf_counter() - start) * 1000:.2f} ms")
+        for paper_id, score in results:
+            print(f"{score:8.1f}  {paper_id}")
+    if args.benchmark:
+        benchmark()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import pandas as pd
+from rdflib import Namespace, Literal
+from rdflib.namespace import RDF
+
+from helper.data_io import RESEARCH_NS, RESOURCE_NS
+
+RESEARCH = Namespace(RESEARCH_NS)
+RESOURCE = Namespace(RESOURCE_NS)
+
+
+def create_uri(resource_type, identifier):
+    return RESOURCE[f"{resource_type}/{str(identifier)}"]
+
+
+# Row -> triples mappings shared by the ABOX builder and the delta mode,
+# so a CSV row always produces the same triples whichever path emits it
+
+def review_uri(row):
+    return create_uri("review", f"rev_{row['authorId']}_{row['paperId']}")
+
+
+def review_triples(row):
+    review_id = f"rev_{row['authorId']}_{row['paperId']}"
+    review_uri = create_uri("review", review_id)
+
+    triples = [
+        (review_uri, RDF.type, RESEARCH.Review),
+        (review_uri, RESEARCH.review_id, Literal(review_id)),
+    ]
+
+    comments = row.get('comments')
+    if pd.notna(comments):
+        triples.append((review_uri, RESEARCH.comments, Literal(comments)))
+
+    vote = row.get('vote')
+    if pd.notna(vote):
+        try:
+            triples.append((review_uri, RESEARCH.vote, Literal(int(vote))))
+        except (TypeError, ValueError):
+            # If vote is not a number, handle as string
+            triples.append((review_uri, RESEARCH.vote, Literal(vote)))
+
+    # Add review relationships
+    author_uri = create_uri("author", row['authorId'])
+    paper_uri = create_uri("paper", row['paperId'])
+    triples.append((author_uri, RESEARCH.reviewed, review_uri))  # Author reviewed the review
+    triples.append((review_uri, RESEARCH.reviews, paper_uri))    # Review reviews the paper
+    return triples
+
+
+def paper_keyword_triples(row):
+    paper_uri = create_uri("paper", row['paperId'])
+    keyword_uri = create_uri("keyword", row['keywordId'])
+    return [(paper_uri, RESEARCH.related_to, keyword_uri)]
+
+
+def expertise_triples(row):
+    author_uri = create_uri("author", row['authorId'])
+    keyword_uri = create_uri("keyword", row['keywordId'])
+    return [(author_uri, RESEARCH.has_expertise, keyword_uri)]
@@ -0,0 +1,207 @@
+import argparse
+import hashlib
+import heapq
+import math
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from rdflib import Literal
+
+
+# Bit-array Bloom filter over encoded triples (bytes)
+class BloomFilter:
+    def __init__(self, expected_items, false_positive_rate=0.01):
+        expected_items = max(expected_items, 1)
+        self.size = max(8, int(-expected_items * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / expected_items * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    # Add the item; returns True if it may have been added before
+    def add(self, item):
+        seen = True
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                seen = False
+                self.bits[byte] |= 1 << bit
+        return seen
+
+
+# Characters N-Triples string literals must escape
+NT_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"})
+
+
+def _nt_term(term):
+    if not isinstance(term, Literal):
+        return term.n3()
+    text = f'"{str(term).translate(NT_ESCAPES)}"'
+    if term.language:
+        return f"{text}@{term.language}"
+    if term.datatype:
+        return f"{text}^^<{term.datatype}>"
+    return text
+
+
+# One N-Triples line for an rdflib triple. Term.n3() writes literals containing newlines
+# as multi-line """...""" strings, which the line-based sort below would tear apart.
+def ntriples_line(triple):
+    return " ".join(_nt_term(term) for term in triple) + " .\n"
+
+
+def _write_run(lines, run_dir, run_index):
+    run_file = run_dir / f"run_{run_index:05d}.nt"
+    with open(run_file, "wb") as f:
+        f.writelines(lines)
+    return run_file
+
+
+# k-way merge of sorted run files into output_file, dropping duplicates; returns the lines written
+def _merge_runs(run_files, output_file):
+    written, previous = 0, None
+    files = [open(run_file, "rb") for run_file in run_files]
+    try:
+        with open(output_file, "wb") as out:
+            for line in heapq.merge(*files):
+                if line != previous:
+                    out.write(line)
+                    written += 1
+                    previous = line
+    finally:
+        for f in files:
+            f.close()
+    return written
+
+
+def _normalize(line):
+    line = line.strip()
+    return line + b"\n" if line else None
+
+
+# Sort encoded N-Triples lines in runs of at most run_bytes, then k-way merge the runs
+# dropping duplicates. Without a Bloom filter every run is deduplicated with a set before
+# it is sorted. With one, only lines the filter has possibly seen before go through that
+# set (into separate "suspect" runs); lines it has never seen are unique by construction
+# and are just sorted, which keeps the per-run memory overhead down. Runs are merged at most
+# fan_in at a time, in several passes when there are more, to stay below file-descriptor limits.
+def external_sort_dedup(lines, output_file, run_bytes=256 * 2**20, tmp_dir=None, bloom=None, fan_in=256):
+    start = time.perf_counter()
+    run_dir = Path(tempfile.mkdtemp(prefix="triple_sort_", dir=tmp_dir))
+    runs, read = [], 0
+    try:
+        fresh, suspects, fresh_bytes, suspect_bytes = [], set(), 0, 0
+        for line in lines:
+            line = _normalize(line if isinstance(line, bytes) else line.encode("utf-8"))
+            if line is None or line.startswith(b"#"):
+                continue
+            read += 1
+            if bloom is not None and not bloom.add(line):
+                fresh.append(line)
+                fresh_bytes += len(line)
+            else:
+                suspects.add(line)
+                suspect_bytes += len(line)
+
+            if fresh_bytes + suspect_bytes >= run_bytes:
+                if fresh:
+                    fresh.sort()
+                    runs.append(_write_run(fresh, run_dir, len(runs)))
+                if suspects:
+                    runs.append(_write_run(sorted(suspects), run_dir, len(runs)))
+                fresh, suspects, fresh_bytes, suspect_bytes = [], set(), 0, 0
+
+        if fresh:
+            fresh.sort()
+            runs.append(_write_run(fresh, run_dir, len(runs)))
+        if suspects:
+            runs.append(_write_run(sorted(suspects), run_dir, len(runs)))
+        del fresh, suspects
+
+        # Multi-pass merge: at most fan_in run files are open at a time
+        fan_in, pending, passes, next_run = max(fan_in, 2), list(runs), 0, len(runs)
+        while len(pending) > fan_in:
+            merged = []
+            for i in range(0, len(pending), fan_in):
+                group = pending[i:i + fan_in]
+                if len(group) == 1:
+                    merged.append(group[0])
+                    continue
+                merged_file = run_dir / f"run_{next_run:05d}.nt"
+                next_run += 1
+                _merge_runs(group, merged_file)
+                for run_file in group:
+                    run_file.unlink()
+                merged.append(merged_file)
+            pending = merged
+            passes += 1
+        written = _merge_runs(pending, output_file)
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+    print(f"Sorted {read} triples in {len(runs)} runs ({passes + 1} merge passes) into {output_file}: "
+          f"{written} unique, {read - written} duplicates dropped ({time.perf_counter() - start:.2f}s)")
+    return written
+
+
+# Regression check: literals with newlines, quotes and backslashes must survive the
+# sort as single lines and parse back as N-Triples
+def check():
+    from rdflib import Graph, URIRef
+
+    subject, predicate = URIRef("http://example.org/research/paper_1"), URIRef("http://example.org/research#abstract")
+    triples = [
+        (subject, predicate, Literal("zzz line one\nAAA line two")),
+        (subject, predicate, Literal('carriage\rreturn, "quoted" and back\\slash')),
+        (subject, predicate, Literal("plain")),
+        (subject, predicate, Literal("tagged\nline", lang="en")),
+        (subject, URIRef("http://example.org/research#vote"), Literal(3)),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = Path(tmp) / "check.nt"
+        written = external_sort_dedup([ntriples_line(t) for t in triples * 2], output_file, run_bytes=64,
+                                      fan_in=2)
+        parsed = Graph().parse(str(output_file), format="nt")
+    assert written == len(triples), f"expected {len(triples)} unique triples, wrote {written}"
+    assert set(parsed) == set(triples), "sorted N-Triples do not round-trip"
+    print("N-Triples encoding check passed")
+
+
+def _read_lines(paths):
+    for path in paths:
+        with open(path, "rb") as f:
+            yield from f
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sort and deduplicate N-Triples files larger than memory")
+    parser.add_argument("inputs", nargs="*", type=Path, help="N-Triples input files")
+    parser.add_argument("-o", "--output", type=Path)
+    parser.add_argument("--run-size", type=float, default=256, help="Size of each in-memory sort run in MB")
+    parser.add_argument("--fan-in", type=int, default=256, help="Maximum number of runs merged at once")
+    parser.add_argument("--tmp-dir", type=Path, default=None, help="Directory for the sorted runs")
+    parser.add_argument("--bloom", type=int, default=0, metavar="EXPECTED_TRIPLES",
+                        help="Pre-filter with a Bloom filter sized for this many triples")
+    parser.add_argument("--bloom-fp-rate", type=float, default=0.01)
+    parser.add_argument("--check", action="store_true", help="Run the N-Triples round-trip check and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        check()
+        return
+    if not args.inputs or args.output is None:
+        parser.error("inputs and --output are required")
+    bloom = BloomFilter(args.bloom, args.bloom_fp_rate) if args.bloom else None
+    external_sort_dedup(_read_lines(args.inputs), args.output,
+                        run_bytes=int(args.run_size * 2**20), tmp_dir=args.tmp_dir, bloom=bloom,
+                        fan_in=args.fan_in)
+
+
+if __name__ == "__main__":
+    main()